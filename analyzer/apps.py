@@ -1,6 +1,6 @@
-from django.apps import AppConfig
-
-
-class AnalyzerConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'analyzer'
+from django.apps import AppConfig
+
+
+class AnalyzerConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'analyzer'
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import hashlib
+import pandas as pd
+from rim.settings import decision_foldername, cropping_threshold, gaze_analysis_threshold
+from rim.utils import file_sha256
+
+"""
+Incremental execution of the case study phases
+
+The phases of a case study are modeled as a DAG in which each phase consumes the outputs of the phases it depends on.
+Every phase executed over a family folder is identified by a key: a hash of its own inputs (log, screenshots, model files,
+phase parameters and the settings it depends on), the version of the phases outputs and the keys of the phases it depends
+on. The keys of the last execution are stored in a manifest inside the family folder, so a phase is only executed again
+when its key changes, its outputs are missing or its 'skip' parameter is explicitly False.
+"""
+
+manifest_filename = "phases_manifest.json"
+# Version of the phases and their outputs: increase it when a change of the platform modifies the outputs of the phases,
+# so the outputs left by previous versions are not reused
+phases_version = 1
+
+# Phases (named as in 'case_study_phases_args') and the phases whose outputs they consume
+phases_dag = {
+    'ui_elements_detection': [],
+    'noise_filtering': ['ui_elements_detection'],
+    'ui_elements_classification': ['ui_elements_detection'],
+    'feature_extraction': ['ui_elements_classification'],
+    'extract_training_dataset': ['feature_extraction'],
+    'decision_tree_training': ['extract_training_dataset'],
+}
+
+# Inputs of each phase that are not produced by other phases
+phases_inputs = {
+    'ui_elements_detection': ['log', 'screenshots'],
+    'noise_filtering': ['log'],
+    'ui_elements_classification': ['log', 'model'],
+    'feature_extraction': ['log'],
+    'extract_training_dataset': [],
+    'decision_tree_training': [],
+}
+
+# Settings of the platform used by each phase
+phases_settings = {
+    'ui_elements_detection': {'cropping_threshold': cropping_threshold},
+    'noise_filtering': {'gaze_analysis_threshold': gaze_analysis_threshold},
+}
+
+# Position of the 'skip' parameter in the arguments tuple of the phases that have it
+phases_skip_arg = {
+    'ui_elements_detection': 4,
+    'ui_elements_classification': 7,
+    'feature_extraction': 6,
+}
+
+
+def phase_outputs(phase, family_path, args):
+    """
+    Files or folders that must exist in the family folder after executing the phase
+
+    :param phase: Phase name
+    :type phase: str
+    :param family_path: Path to the family folder, ending with the path separator
+    :type family_path: str
+    :param args: Arguments tuple of the phase
+    :type args: tuple
+    :returns: List of paths
+    :rtype: list
+    """
+    match phase:
+        case 'ui_elements_detection':
+            outputs = ['components_json', 'components_json/components.sqlite3', 'components_npy']
+        case 'ui_elements_classification':
+            outputs = ['components_json', 'components_json/components.sqlite3']
+        case 'feature_extraction':
+            outputs = ['enriched_log.csv']
+        case 'extract_training_dataset':
+            outputs = ['preprocessed_dataset.csv']
+        case 'decision_tree_training':
+            outputs = ['decision_tree.log'] if args[2] == 'sklearn' else [decision_foldername]
+        case _:
+            outputs = []
+    return [family_path + o for o in outputs]
+
+
+def is_forced(phase, args):
+    """
+    :returns: Whether the 'skip' parameter of the phase is explicitly False (it is None when it is not configured), so
+              the phase is executed again even if it is up to date
+    :rtype: bool
+    """
+    return phase in phases_skip_arg and args[phases_skip_arg[phase]] is False
+
+
+class PhasesManifest:
+    """
+    Keys and execution times of the last execution of each phase over a family folder. It also memoizes the hash of
+    the input files by size and modification time, so unchanged screenshots and models are not read again
+    """
+
+    def __init__(self, family_path):
+        self.path = family_path + manifest_filename
+        self.content = {'phases': {}, 'files': {}}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                self.content = json.load(f)
+
+    def save(self):
+        with open(self.path, 'w') as f:
+            json.dump(self.content, f, indent=4)
+
+    def file_hash(self, path):
+        stat = os.stat(path)
+        memo = self.content['files'].get(path)
+        if memo and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+            return memo[2]
+        digest = file_sha256(path)
+        self.content['files'][path] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def phase_key(self, phase, family_path, args, screenshot_colname, keys):
+        """
+        Calculates the key of a phase from its inputs
+
+        :param phase: Phase name
+        :type phase: str
+        :param family_path: Path to the family folder, ending with the path separator
+        :type family_path: str
+        :param args: Arguments tuple of the phase
+        :type args: tuple
+        :param screenshot_colname: Name of the column in the log indicating the images names
+        :type screenshot_colname: str
+        :param keys: Keys of the phases executed before in this run
+        :type keys: dict
+        :returns: Key of the phase, or None if some of its inputs are unknown
+        :rtype: str
+        """
+        sha = hashlib.sha256()
+        sha.update(phase.encode())
+        sha.update(str(phases_version).encode())
+        sha.update(json.dumps(args, sort_keys=True, default=str).encode())
+        sha.update(json.dumps(phases_settings.get(phase, {}), sort_keys=True).encode())
+
+        for upstream in phases_dag[phase]:
+            # Phases not executed in this run are represented by the key of the outputs they left in the family folder
+            upstream_key = keys[upstream] if upstream in keys else self.content['phases'].get(upstream, {}).get('key')
+            if upstream_key is None and upstream not in keys:
+                # Outputs not generated by the platform (provided by the user): they are identified by their content
+                upstream_outputs = phase_outputs(upstream, family_path, None)
+                if upstream_outputs and all(os.path.isfile(o) for o in upstream_outputs):
+                    upstream_key = "".join(self.file_hash(o) for o in upstream_outputs)
+            if upstream_key is None:
+                return None
+            sha.update(upstream_key.encode())
+
+        log_path = family_path + 'log.csv'
+        for phase_input in phases_inputs[phase]:
+            match phase_input:
+                case 'log':
+                    sha.update(self.file_hash(log_path).encode())
+                case 'screenshots':
+                    screenshots = pd.read_csv(log_path, sep=",").loc[:, screenshot_colname].values.tolist()
+                    for screenshot in screenshots:
+                        sha.update(self.file_hash(family_path + screenshot).encode())
+                case 'model':
+                    # model and model properties
+                    for path in args[:2]:
+                        sha.update(self.file_hash(path).encode())
+        return sha.hexdigest()
+
+    def is_up_to_date(self, phase, key, outputs):
+        last_execution = self.content['phases'].get(phase)
+        return key is not None and last_execution is not None and last_execution['key'] == key and all(os.path.exists(o) for o in outputs)
+
+    def cached_times(self, phase):
+        times = dict(self.content['phases'][phase]['times'])
+        times['cached'] = True
+        return times
+
+    def record(self, phase, key, times):
+        """
+        Records the execution of a phase. The manifest is written once by 'save', after executing the phases of the family
+        """
+        self.content['phases'][phase] = {'key': key, 'times': times, 'recorded_at': time.time()}
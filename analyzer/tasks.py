@@ -1,8 +1,28 @@
-from celery import shared_task
-import analyzer.views as analyzer
-
-# Functions in this file with the shared_task decorator will be picked up by celery and executed asynchronously
-
-@shared_task()
-def init_generate_case_study(case_study_id):
-    analyzer.generate_case_study(case_study_id)
+from celery import shared_task
+from celery.signals import worker_process_init
+import analyzer.views as analyzer
+import featureextraction.model_registry as model_registry
+from rim.settings import warm_up_models
+
+# Functions in this file with the shared_task decorator will be picked up by celery and executed asynchronously
+
+@shared_task()
+def init_generate_case_study(case_study_id):
+    analyzer.generate_case_study(case_study_id)
+
+@shared_task()
+def generate_case_study_unit(case_study_id, scenario, n):
+    return analyzer.execute_case_study_unit(case_study_id, scenario, n)
+
+@shared_task()
+def merge_case_study_times(chunks_results, case_study_id, metadata_path):
+    # Each chunk subtask returns the list of (scenario, family, times) of the units it has executed
+    units_times = [unit_times for chunk in chunks_results for unit_times in chunk]
+    return analyzer.save_case_study_times(case_study_id, metadata_path, units_times)
+
+@worker_process_init.connect
+def warm_up_worker_models(**kwargs):
+    # Models are loaded once per worker process and shared by all the tasks it executes
+    if warm_up_models:
+        model_registry.warm_up()
+
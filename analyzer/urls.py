@@ -1,11 +1,11 @@
-from urllib import request
-from django.urls import path
-from . import views
-
-app_name = 'analyzer'
-
-urlpatterns = [
-    path('', views.CaseStudyView.as_view(), name='run-case-study'),
-    path('<int:case_study_id>', views.SpecificCaseStudyView.as_view(), name='get-case-study'),
-    path('<int:case_study_id>/result', views.ResultCaseStudyView.as_view(), name='get-case-study-result'),
+from urllib import request
+from django.urls import path
+from . import views
+
+app_name = 'analyzer'
+
+urlpatterns = [
+    path('', views.CaseStudyView.as_view(), name='run-case-study'),
+    path('<int:case_study_id>', views.SpecificCaseStudyView.as_view(), name='get-case-study'),
+    path('<int:case_study_id>/result', views.ResultCaseStudyView.as_view(), name='get-case-study-result'),
 ]
\ No newline at end of file
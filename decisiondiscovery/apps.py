@@ -1,6 +1,6 @@
-from django.apps import AppConfig
-
-
-class DecisiondiscoveryConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'decisiondiscovery'
+from django.apps import AppConfig
+
+
+class DecisiondiscoveryConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'decisiondiscovery'
@@ -1,7 +1,7 @@
-from django.urls import path
-from . import views
-
-# urlpatterns = [
-#     path('flat-dataset-row/', views.flat_dataset_row.as_view(), name='flat-dataset-row'),
-#     path('plot-decision-tree/', views.plot_decision_tree.as_view(),name='plot-decision-tree'),
+from django.urls import path
+from . import views
+
+# urlpatterns = [
+#     path('flat-dataset-row/', views.flat_dataset_row.as_view(), name='flat-dataset-row'),
+#     path('plot-decision-tree/', views.plot_decision_tree.as_view(),name='plot-decision-tree'),
 # ]
\ No newline at end of file
@@ -1,32 +1,64 @@
-from tensorflow.keras.models import Model,load_model
-import numpy as np
-import cv2
-
-from featureextraction.CNN.ConfigCNN import Config
-
-from tqdm import tqdm
-
-class CompDetCNN:
-    def __init__(self, model_path, model_classes, model_shape):
-        cfg = Config(model_path, model_classes, model_shape)
-        self.model = load_model(cfg.CNN_PATH)
-        self.class_map = cfg.element_class
-        self.image_shape = cfg.image_shape
-
-    def preprocess_img(self, image):
-        image = cv2.resize(image, self.image_shape[:2])
-        x = (image / 255).astype('float32')
-        x = np.array([x])
-        return x
-
-    def predict(self, imgs):
-        if self.model is None:
-            print("*** No model loaded ***")
-            return
-        result = []
-        for i in range(len(imgs)):
-            X = self.preprocess_img(imgs[i])
-            Y = self.class_map[np.argmax(self.model.predict(X, verbose=0))]
-            result.append(Y)
-        return result
-            
\ No newline at end of file
+from tensorflow.keras.models import Model,load_model
+import numpy as np
+import cv2
+
+from featureextraction.CNN.ConfigCNN import Config
+
+from tqdm import tqdm
+
+class CompDetCNN:
+    def __init__(self, model_path, model_classes, model_shape):
+        cfg = Config(model_path, model_classes, model_shape)
+        self.model = load_model(cfg.CNN_PATH)
+        self.class_map = cfg.element_class
+        self.image_shape = cfg.image_shape
+
+    def preprocess_img(self, image):
+        image = cv2.resize(image, self.image_shape[:2])
+        x = (image / 255).astype('float32')
+        x = np.array([x])
+        return x
+
+    def preprocess_imgs(self, imgs):
+        """
+        Resizes and normalizes the images into a single preallocated float32 array of shape (N, H, W, C)
+        """
+        # cv2.resize takes the size as (width, height)
+        X = np.empty((len(imgs), self.image_shape[1], self.image_shape[0]) + tuple(self.image_shape[2:]), dtype=np.float32)
+        for i in range(len(imgs)):
+            X[i] = cv2.resize(imgs[i], self.image_shape[:2]) / 255
+        return X
+
+    def predict(self, imgs, batch_size=64):
+        """
+        :param imgs: Images (crops) to classify
+        :type imgs: list
+        :param batch_size: Number of images given to the model in each inference call
+        :type batch_size: int
+        :returns: Class of each image
+        :rtype: list
+        """
+        if self.model is None:
+            print("*** No model loaded ***")
+            return
+        if len(imgs) == 0:
+            return []
+        X = self.preprocess_imgs(imgs)
+        labels = np.concatenate([np.argmax(self.model.predict_on_batch(X[i:i + batch_size]), axis=1)
+                                 for i in range(0, len(X), batch_size)])
+        return [self.class_map[label] for label in labels]
+
+    def predict_groups(self, imgs_groups, batch_size=64):
+        """
+        Classifies the images of several groups (for instance, the crops of several screenshots) in the same batches
+
+        :param imgs_groups: List of lists of images
+        :type imgs_groups: list
+        :returns: Class of each image, grouped as the input
+        :rtype: list
+        """
+        result = self.predict([img for imgs in imgs_groups for img in imgs], batch_size)
+        if result is None:
+            return
+        bounds = np.cumsum([0] + [len(imgs) for imgs in imgs_groups])
+        return [result[bounds[i]:bounds[i + 1]] for i in range(len(imgs_groups))]
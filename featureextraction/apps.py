@@ -1,6 +1,6 @@
-from django.apps import AppConfig
-
-
-class FeatureextractionConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'featureextraction'
+from django.apps import AppConfig
+
+
+class FeatureextractionConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'featureextraction'
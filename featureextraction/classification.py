@@ -1,216 +1,374 @@
-# Components detection
-import json
-import numpy as np
-import pandas as pd
-import os
-# Classification
-import os
-import pandas as pd
-import numpy as np
-import tensorflow as tf
-from keras.models import model_from_json
-from tqdm import tqdm
-from featureextraction.CNN.CompDetCNN import CompDetCNN
-
-default_ui_elements_classification_classes = ['x0_Button', 'x0_CheckBox', 'x0_CheckedTextView', 'x0_EditText', 'x0_ImageButton', 'x0_ImageView', 'x0_NumberPicker', 'x0_RadioButton', 'x0_RatingBar', 'x0_SeekBar', 'x0_Spinner', 'x0_Switch', 'x0_TextView', 'x0_ToggleButton']
-default_ui_elements_classification_image_shape = [64, 64, 3]
-
-###################################################################################################
-######################################       UTILS        #########################################
-###################################################################################################
-def pad(img, h, w):
-    """
-    Zero-padding function to resize the images
-    """
-    #  in case when you have odd number
-    top_pad = np.floor((h - img.shape[0]) / 2).astype(np.uint16)
-    bottom_pad = np.ceil((h - img.shape[0]) / 2).astype(np.uint16)
-    right_pad = np.ceil((w - img.shape[1]) / 2).astype(np.uint16)
-    left_pad = np.floor((w - img.shape[1]) / 2).astype(np.uint16)
-    return np.copy(np.pad(img, ((top_pad, bottom_pad), (left_pad, right_pad), (0, 0)), mode='constant', constant_values=0))
-    
-def check_metadata_json_exists(ui_log_path, screenshot_colname, metadata_json_root):
-    """
-    Auxiliar function of 'ui_elements_classification' to check if there is any missing metadata json file
-
-    :param metadata_json_root: Path where the json will all the components is stored
-    :type metadata_json_root: str
-    :param screenshot_colname: Name of the column in the log indicating the images names
-    :type screenshot_colname: str
-    :param ui_log_path: Path twhere the log we want to enrich is located
-    :type ui_log_path: str
-    :returns screenshot_filenames: filenames of log screenshots
-    :rtype: list
-    :returns missing_json_file: a boolean that indicates if there is any missing metadata json
-    :rtype: bool
-    """
-    log = pd.read_csv(ui_log_path, sep=",")
-    # screenshot_filenames = [ x + ".npy" for x in log.loc[:,"Screenshot"].values.tolist()]
-    screenshot_filenames = log.loc[:, screenshot_colname].values.tolist()
-
-    missing_json_file = False
-
-    for screenshot in screenshot_filenames:
-        if not os.path.exists(metadata_json_root + screenshot + '.json'):
-            missing_json_file = True
-            break
-
-    return screenshot_filenames, missing_json_file
-
-###################################################################################################
-###################################################################################################
-
-def uied_ui_elements_classification(model="resources/models/custom-v2.h5", model_properties="resources/models/custom-v2-classes.json", ui_elements_crops_npy_root="resources/screenshots/components_npy/",
-                            metadata_json_root="resources/screenshots/components_json/", ui_log_path="resources/log.csv", screenshot_colname="Screenshot", text_classname="text",
-                            skip=False, ui_elements_classification_classes=default_ui_elements_classification_classes, ui_elements_classification_image_shape=default_ui_elements_classification_image_shape):
-    """
-    With this function we classify the copped component from each of the sreenshots to later add to the log the number of
-    columns corresponding to the ammount to classes in the given model. These are the classes that a GUI component can fall into.
-    The values indicated in these columns added indicate how many GUI components are present with regard to their class.
-    Example. 2 button, 3 image_view, 1 text_view, etc.
-    
-    :param_model: Classification model  
-    :type param_model: h5
-    :param model_properties:
-    :type model_properties: Classes and shape of the model
-    :param ui_elements_crops_npy_root: Path where the cropped images are stored
-    :type ui_elements_crops_npy_root: str
-    :param metadata_json_root: Path where the json will all the components is stored
-    :type metadata_json_root: str
-    :param ui_log_path: Path twhere the log we want to enrich is located
-    :type ui_log_path: str
-    :param enriched_log_output_path: Path to save the enriched log
-    :type enriched_log_output_path: str
-    :param screenshot_colname: Name of the column in the log indicating the images names
-    :type screenshot_colname: str
-    :param text_classname: Name of the the corresponding class for the texts
-    :type text_classname: str
-    :param skip: Rewrite classification data (json files)
-    :type skip: bool
-    :param ui_elements_classification_classes: Model classes
-    :type ui_elements_classification_classes: list
-    
-    """
-
-    screenshot_filenames, missing_json_file = check_metadata_json_exists(ui_log_path, screenshot_colname, metadata_json_root)
-
-    if missing_json_file or (not skip):
-        # Load the model properties from the json
-        f = json.load(open(model_properties,))
-        classes = ui_elements_classification_classes
-        shape = tuple(ui_elements_classification_image_shape)
-
-        # Load the ML classifier model for the crops
-        # Default model is custom-v2, a model creating by using transfer learning from UIED's generalized model
-        classifier = {}
-        classifier['Elements'] = CompDetCNN(
-            model, classes, shape)
-        print("\n\nLoaded ML model from disk\n")
-
-        for screenshot_filename in tqdm(screenshot_filenames, desc=f"Classifying images in {ui_elements_crops_npy_root}"):
-            # This network gives as output the name of the detected class. Additionally, we moddify the json file with the components to add the corresponding classes
-            with open(metadata_json_root + screenshot_filename + '.json', 'r') as f:
-                data = json.load(f)
-
-            clips =  np.load(ui_elements_crops_npy_root+ screenshot_filename + ".npy", allow_pickle=True).tolist()
-            result = classifier['Elements'].predict(clips)
-
-            for j in range(0, len(result)):
-                data["compos"][j]["class"] = result[j]
-            with open(metadata_json_root + screenshot_filename + '.json', "w") as jsonFile:
-                json.dump(data, jsonFile)
-
-
-def legacy_ui_elements_classification(model="resources/models/model.h5", model_properties="resources/models/model.json", ui_elements_crops_npy_root="resources/screenshots/components_npy/",
-                            metadata_json_root="resources/screenshots/components_json/", ui_log_path="resources/log.csv", screenshot_colname="Screenshot", text_classname="x0_TextView",
-                            skip=False, ui_elements_classification_classes=default_ui_elements_classification_classes, ui_elements_classification_image_shape=default_ui_elements_classification_image_shape):
-    """
-    With this function we classify the copped component from each of the sreenshots to later add to the log the number of
-    columns corresponding to the ammount to classes in the given model. These are the classes that a GUI component can fall into.
-    The values indicated in these columns added indicate how many GUI components are present with regard to their class.
-    Example. 2 button, 3 image_view, 1 text_view, etc.
-
-    :param_model: Weights of the edges of the classification neural network 
-    :type param_model: h5
-    :param model_properties:
-    :type model_properties: json file
-    :param ui_elements_crops_npy_root: Path where the cropped images are stored
-    :type ui_elements_crops_npy_root: str
-    :param metadata_json_root: Path where the json will all the components is stored
-    :type metadata_json_root: str
-    :param ui_log_path: Path twhere the log we want to enrich is located
-    :type ui_log_path: str
-    :param enriched_log_output_path: Path to save the enriched log
-    :type enriched_log_output_path: str
-    :param screenshot_colname: Name of the column in the log indicating the images names
-    :type screenshot_colname: str
-    :param text_classname: Name of the the corresponding class for the texts
-    :type text_classname: str
-    :param skip: Rewrite classification data (json files)
-    :type skip: bool
-    :returns: Enriched log
-    :rtype: DataFrame
-    """
-
-    screenshot_filenames, missing_json_file = check_metadata_json_exists(ui_log_path, screenshot_colname, metadata_json_root)
-
-    if missing_json_file or (not skip):
-        # load json and create model
-        json_file = open(model_properties, 'r')
-        loaded_model_json = json_file.read()
-        json_file.close()
-        loaded_model = model_from_json(loaded_model_json)
-
-        # load weights into new model
-        loaded_model.load_weights(model)
-
-        crops_info = {}
-        
-        for img_filename in screenshot_filenames:
-            crops = np.load(ui_elements_crops_npy_root + img_filename + ".npy", allow_pickle=True)
-            text_crops = np.load(ui_elements_crops_npy_root + img_filename+"_texts.npy", allow_pickle=True)
-            crops_info[img_filename] = {'content': crops, 'text': text_crops}    
-
-        # we reduce their size to adapt them to the neural network entry
-        for i in range(0, len(crops_info)):
-            preprocessed_crops_filename = ui_elements_crops_npy_root + "preprocessed_" + screenshot_filenames[i] + ".npy"
-            preprocessed_crops_exists = os.path.exists(preprocessed_crops_filename)
-            
-            if not preprocessed_crops_exists:
-                x = ui_elements_classification_image_shape[0]
-                y = ui_elements_classification_image_shape[1]
-                preprocessed_crops = []
-                for img in crops_info[screenshot_filenames[i]]["content"]:
-                    if img.shape[1] > y:
-                        img = img[0:img.shape[0], 0:y]
-                    if img.shape[0] > x:
-                        img = img[0:x, 0:img.shape[1]]
-                    crop_padded = pad(img, x, y)
-                    crop_resized = tf.image.resize(crop_padded, [50, 50], method=tf.image.ResizeMethod.NEAREST_NEIGHBOR, preserve_aspect_ratio=True, antialias=True)
-                    preprocessed_crops.append(crop_resized)
-                    # print("Cropped: "+str(img_resized.shape))
-                crops_info[screenshot_filenames[i]]["content_preprocessed"] = preprocessed_crops
-
-                # We store all preprocessed crops
-                preprocessed_crops_npy = np.array(crops_info[screenshot_filenames[i]]["content_preprocessed"])
-                np.save(preprocessed_crops_filename, preprocessed_crops_npy)
-            else:
-                preprocessed_crops_npy = np.load(preprocessed_crops_filename, allow_pickle=True)
-
-            predict_x = loaded_model.predict(preprocessed_crops_npy)
-
-            # This neural network returns as output a integer indicating each of its classes. This number must me mapped to its corresponding class name (str)
-            result = np.argmax(predict_x, axis=1)
-            result_mapped = [text_classname if crops_info[screenshot_filenames[i]]["text"][index] else ui_elements_classification_classes[x] for index, x in enumerate(result)]
-
-            crops_info[screenshot_filenames[i]]["result"] = result_mapped
-            # crop_imgs[screenshot_filenames[i]]["result_freq"] = pd.Series(result_mapped).value_counts()
-            # crop_imgs[screenshot_filenames[i]]["result_freq_df"] = crop_imgs[screenshot_filenames[i]]["result_freq"].to_frame().T
-            
-            # Update the json file with components
-            with open(metadata_json_root + screenshot_filenames[i] + '.json', 'r') as f:
-                data = json.load(f)
-            for j in range(0, len(result_mapped)):
-                data["compos"][j]["class"] = result_mapped[j]
-            with open(metadata_json_root + screenshot_filenames[i] + '.json', "w") as jsonFile:
-                json.dump(data, jsonFile)
+# Components detection
+import json
+import numpy as np
+import pandas as pd
+import os
+# Classification
+import os
+import pandas as pd
+import numpy as np
+from tqdm import tqdm
+import featureextraction.model_registry as model_registry
+from featureextraction.crop_store import CropStore
+from featureextraction.component_store import ComponentStore, export_components_parquet
+import threading
+import queue
+from collections import deque
+
+default_ui_elements_classification_classes = ['x0_Button', 'x0_CheckBox', 'x0_CheckedTextView', 'x0_EditText', 'x0_ImageButton', 'x0_ImageView', 'x0_NumberPicker', 'x0_RadioButton', 'x0_RatingBar', 'x0_SeekBar', 'x0_Spinner', 'x0_Switch', 'x0_TextView', 'x0_ToggleButton']
+default_ui_elements_classification_image_shape = [64, 64, 3]
+
+###################################################################################################
+######################################       UTILS        #########################################
+###################################################################################################
+def nearest_neighbor_indexes(in_size, out_size):
+    """
+    Source indexes of a nearest neighbor resize with half pixel centers (as tf.image.resize), computed in float32
+    """
+    scale = np.float32(in_size) / np.float32(out_size)
+    indexes = np.floor((np.arange(out_size, dtype=np.float32) + np.float32(0.5)) * scale).astype(int)
+    return np.clip(indexes, 0, in_size - 1)
+
+
+def preprocess_legacy_crops(crops, image_shape, size=(50, 50)):
+    """
+    Prepares the crops for the legacy classifier: cuts them to the image shape, zero-pads them (centered) to that shape
+    and resizes them to 'size' preserving the aspect ratio with nearest neighbor interpolation. The result is the same
+    as tf.image.resize (NEAREST_NEIGHBOR, preserve_aspect_ratio=True) over each padded crop, computed for all the crops
+    at once
+
+    :param crops: Crops of the screenshot
+    :type crops: list
+    :param image_shape: Shape of the crops after padding
+    :type image_shape: list
+    :returns: Array of shape (N, height, width, channels) with the preprocessed crops
+    :rtype: numpy.ndarray
+    """
+    x, y = image_shape[0], image_shape[1]
+    if len(crops) == 0:
+        return np.array([])
+    channels = crops[0].shape[2]
+    padded = np.zeros((len(crops), x, y, channels), dtype=crops[0].dtype)
+    for i, img in enumerate(crops):
+        img = img[0:x, 0:y]
+        top = (x - img.shape[0]) // 2
+        left = (y - img.shape[1]) // 2
+        padded[i, top:top + img.shape[0], left:left + img.shape[1]] = img
+
+    # preserve the aspect ratio as tf.image.resize does (float32 scale, round half to even)
+    scale = min(np.float32(size[0]) / np.float32(x), np.float32(size[1]) / np.float32(y))
+    height = int(np.round(scale * np.float32(x)))
+    width = int(np.round(scale * np.float32(y)))
+    rows = nearest_neighbor_indexes(x, height)
+    columns = nearest_neighbor_indexes(y, width)
+    return padded[:, rows[:, None], columns[None, :]]
+    
+def check_metadata_json_exists(ui_log_path, screenshot_colname, metadata_json_root):
+    """
+    Auxiliar function of 'ui_elements_classification' to check if there is any screenshot missing in the component store
+
+    :param metadata_json_root: Path where the json will all the components is stored
+    :type metadata_json_root: str
+    :param screenshot_colname: Name of the column in the log indicating the images names
+    :type screenshot_colname: str
+    :param ui_log_path: Path twhere the log we want to enrich is located
+    :type ui_log_path: str
+    :returns screenshot_filenames: filenames of log screenshots
+    :rtype: list
+    :returns missing_json_file: a boolean that indicates if there is any missing metadata json
+    :rtype: bool
+    """
+    log = pd.read_csv(ui_log_path, sep=",")
+    # screenshot_filenames = [ x + ".npy" for x in log.loc[:,"Screenshot"].values.tolist()]
+    screenshot_filenames = log.loc[:, screenshot_colname].values.tolist()
+
+    component_store = ComponentStore(metadata_json_root)
+    missing_json_file = False
+
+    for screenshot in screenshot_filenames:
+        if screenshot not in component_store:
+            missing_json_file = True
+            break
+
+    return screenshot_filenames, missing_json_file
+
+def produce_screenshots_crops(crop_store, component_store, screenshot_filenames, keep_materialized_crops, crops_queue, stop):
+    """
+    Producer of the classification pipeline: reads the components and the crops of each screenshot, in the log order.
+    It finishes when 'stop' is set, since nobody consumes the queue once the classification has failed
+    """
+    def put(item):
+        while not stop.is_set():
+            try:
+                crops_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    try:
+        for screenshot_filename in screenshot_filenames:
+            data = component_store.get(screenshot_filename)
+            clips = crop_store.materialize(screenshot_filename, data, keep_materialized_crops)
+            if not put((screenshot_filename, len(clips), clips)):
+                return
+        put(None)
+    except Exception as e:
+        put(e)
+
+
+def write_classified_screenshots(component_store, results_queue, errors):
+    """
+    Writer of the classification pipeline: updates the classes of the components of the classified screenshots, all the
+    screenshots waiting in the queue at once
+    """
+    finished = False
+    while not finished:
+        items = [results_queue.get()]
+        while items[-1] is not None and not results_queue.empty():
+            items.append(results_queue.get())
+        if items[-1] is None:
+            finished = True
+            items.pop()
+        if errors or not items:
+            # keep consuming, so the classifier is never blocked by a failed writer
+            continue
+        try:
+            component_store.set_classes(items)
+        except Exception as e:
+            errors.append(e)
+
+
+def classify_screenshots_stream(classifier, crop_store, component_store, screenshot_filenames, keep_materialized_crops=False, batch_size=64, prefetch=4):
+    """
+    Classifies the crops of all the screenshots in a pipeline of three stages: a thread reading the crops of the next
+    screenshots, the model classifying fixed-size batches of crops (which span several screenshots) and a thread
+    writing the classes of the screenshots whose crops are all classified. Reading, inference and writing overlap.
+
+    :param classifier: Classification model
+    :type classifier: CompDetCNN
+    :param crop_store: Store with the crops of the screenshots
+    :type crop_store: CropStore
+    :param component_store: Store with the components of the screenshots
+    :type component_store: ComponentStore
+    :param prefetch: Maximum number of screenshots read and not classified yet
+    :type prefetch: int
+    """
+    crops_queue = queue.Queue(maxsize=prefetch)
+    results_queue = queue.Queue(maxsize=prefetch)
+    writer_errors = []
+    stop = threading.Event()
+    producer = threading.Thread(target=produce_screenshots_crops, daemon=True,
+                                args=(crop_store, component_store, screenshot_filenames, keep_materialized_crops, crops_queue, stop))
+    writer = threading.Thread(target=write_classified_screenshots, args=(component_store, results_queue, writer_errors))
+    producer.start()
+    writer.start()
+
+    # screenshots with crops not classified yet (name, number of crops), classes of their classified crops and crops to classify
+    pending = deque()
+    classes = []
+    batch = []
+
+    def classify(imgs):
+        if imgs:
+            classes.extend(classifier.predict(imgs, batch_size))
+        while pending and len(classes) >= pending[0][1]:
+            screenshot_filename, crops_number = pending.popleft()
+            results_queue.put((screenshot_filename, classes[:crops_number]))
+            del classes[:crops_number]
+
+    try:
+        with tqdm(total=len(screenshot_filenames), desc=f"Classifying images in {crop_store.root}") as progress:
+            while True:
+                item = crops_queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                if item is None:
+                    break
+                screenshot_filename, crops_number, clips = item
+                pending.append((screenshot_filename, crops_number))
+                batch.extend(clips)
+                while len(batch) >= batch_size:
+                    classify(batch[:batch_size])
+                    del batch[:batch_size]
+                progress.update()
+            classify(batch)
+    finally:
+        # if the classification failed, the producer may be waiting for room in the queue
+        stop.set()
+        while producer.is_alive():
+            try:
+                crops_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
+        results_queue.put(None)
+        writer.join()
+    if writer_errors:
+        raise writer_errors[0]
+
+def legacy_preprocessed_crops_chunks(crop_store, component_store, screenshot_filenames, image_shape, keep_materialized_crops=False, chunk_size=16):
+    """
+    Generator of the crops of the screenshots preprocessed for the legacy classifier, a chunk of screenshots at a time, so
+    only the crops of one chunk are in memory. The preprocessed crops are stored, and read from the store when they exist
+
+    :param crop_store: Store with the crops of the screenshots
+    :type crop_store: CropStore
+    :param component_store: Store with the components of the screenshots
+    :type component_store: ComponentStore
+    :param image_shape: Shape of the input of the classifier
+    :type image_shape: list
+    :param chunk_size: Number of screenshots of each chunk
+    :type chunk_size: int
+    :returns: Lists of (screenshot filename, preprocessed crops, crops text flags)
+    :rtype: generator
+    """
+    for start in range(0, len(screenshot_filenames), chunk_size):
+        chunk = []
+        for screenshot_filename in screenshot_filenames[start:start + chunk_size]:
+            text_crops = np.load(crop_store.root + screenshot_filename + "_texts.npy", allow_pickle=True)
+
+            # the preprocessed crops are kept in the same store, so they are removed along with the crops when detection runs again
+            preprocessed_crops_key = "preprocessed_" + screenshot_filename
+
+            if preprocessed_crops_key not in crop_store:
+                crops = crop_store.materialize(screenshot_filename, component_store.get(screenshot_filename), keep_materialized_crops)
+                # we reduce their size to adapt them to the neural network entry
+                preprocessed_crops_npy = preprocess_legacy_crops(crops, image_shape)
+
+                # We store all preprocessed crops
+                crop_store.put(preprocessed_crops_key, list(preprocessed_crops_npy))
+            else:
+                preprocessed_crops_npy = np.array(crop_store.get(preprocessed_crops_key))
+
+            chunk.append((screenshot_filename, preprocessed_crops_npy, text_crops))
+        yield chunk
+
+###################################################################################################
+###################################################################################################
+
+def uied_ui_elements_classification(model="resources/models/custom-v2.h5", model_properties="resources/models/custom-v2-classes.json", ui_elements_crops_npy_root="resources/screenshots/components_npy/",
+                            metadata_json_root="resources/screenshots/components_json/", ui_log_path="resources/log.csv", screenshot_colname="Screenshot", text_classname="text",
+                            skip=False, ui_elements_classification_classes=default_ui_elements_classification_classes, ui_elements_classification_image_shape=default_ui_elements_classification_image_shape,
+                            keep_materialized_crops=False, batch_size=64):
+    """
+    With this function we classify the copped component from each of the sreenshots to later add to the log the number of
+    columns corresponding to the ammount to classes in the given model. These are the classes that a GUI component can fall into.
+    The values indicated in these columns added indicate how many GUI components are present with regard to their class.
+    Example. 2 button, 3 image_view, 1 text_view, etc.
+    
+    :param_model: Classification model  
+    :type param_model: h5
+    :param model_properties:
+    :type model_properties: Classes and shape of the model
+    :param ui_elements_crops_npy_root: Path where the cropped images are stored
+    :type ui_elements_crops_npy_root: str
+    :param metadata_json_root: Path where the json will all the components is stored
+    :type metadata_json_root: str
+    :param ui_log_path: Path twhere the log we want to enrich is located
+    :type ui_log_path: str
+    :param enriched_log_output_path: Path to save the enriched log
+    :type enriched_log_output_path: str
+    :param screenshot_colname: Name of the column in the log indicating the images names
+    :type screenshot_colname: str
+    :param text_classname: Name of the the corresponding class for the texts
+    :type text_classname: str
+    :param skip: Rewrite classification data (json files)
+    :type skip: bool
+    :param ui_elements_classification_classes: Model classes
+    :type ui_elements_classification_classes: list
+    :param keep_materialized_crops: Store the crops cropped from the screenshots when detection did not store them (lazy crops)
+    :type keep_materialized_crops: bool
+    :param batch_size: Number of crops given to the model in each inference call
+    :type batch_size: int
+    
+    """
+
+    screenshot_filenames, missing_json_file = check_metadata_json_exists(ui_log_path, screenshot_colname, metadata_json_root)
+
+    if missing_json_file or (not skip):
+        # Load the model properties from the json
+        f = json.load(open(model_properties,))
+        classes = ui_elements_classification_classes
+        shape = tuple(ui_elements_classification_image_shape)
+
+        # Load the ML classifier model for the crops
+        # Default model is custom-v2, a model creating by using transfer learning from UIED's generalized model
+        # The model is loaded once per worker process and shared by the families that use it
+        classifier = {}
+        classifier['Elements'] = model_registry.get_uied_classifier(
+            model, classes, shape)
+        print("\n\nLoaded ML model\n")
+
+        # This network gives as output the name of the detected class. Additionally, we moddify the json file with the components to add the corresponding classes
+        crop_store = CropStore(ui_elements_crops_npy_root)
+        classify_screenshots_stream(classifier['Elements'], crop_store, ComponentStore(metadata_json_root), screenshot_filenames, keep_materialized_crops, batch_size)
+        # Table with the components of all the screenshots (now with their classes), for the analysis of the results
+        export_components_parquet(metadata_json_root)
+
+
+def legacy_ui_elements_classification(model="resources/models/model.h5", model_properties="resources/models/model.json", ui_elements_crops_npy_root="resources/screenshots/components_npy/",
+                            metadata_json_root="resources/screenshots/components_json/", ui_log_path="resources/log.csv", screenshot_colname="Screenshot", text_classname="x0_TextView",
+                            skip=False, ui_elements_classification_classes=default_ui_elements_classification_classes, ui_elements_classification_image_shape=default_ui_elements_classification_image_shape,
+                            keep_materialized_crops=False, batch_size=64, chunk_size=16):
+    """
+    With this function we classify the copped component from each of the sreenshots to later add to the log the number of
+    columns corresponding to the ammount to classes in the given model. These are the classes that a GUI component can fall into.
+    The values indicated in these columns added indicate how many GUI components are present with regard to their class.
+    Example. 2 button, 3 image_view, 1 text_view, etc.
+
+    :param_model: Weights of the edges of the classification neural network 
+    :type param_model: h5
+    :param model_properties:
+    :type model_properties: json file
+    :param ui_elements_crops_npy_root: Path where the cropped images are stored
+    :type ui_elements_crops_npy_root: str
+    :param metadata_json_root: Path where the json will all the components is stored
+    :type metadata_json_root: str
+    :param ui_log_path: Path twhere the log we want to enrich is located
+    :type ui_log_path: str
+    :param enriched_log_output_path: Path to save the enriched log
+    :type enriched_log_output_path: str
+    :param screenshot_colname: Name of the column in the log indicating the images names
+    :type screenshot_colname: str
+    :param text_classname: Name of the the corresponding class for the texts
+    :type text_classname: str
+    :param skip: Rewrite classification data (json files)
+    :type skip: bool
+    :param keep_materialized_crops: Store the crops cropped from the screenshots when detection did not store them (lazy crops)
+    :type keep_materialized_crops: bool
+    :param batch_size: Number of crops given to the model in each inference call
+    :type batch_size: int
+    :param chunk_size: Number of screenshots loaded, preprocessed and classified at the same time
+    :type chunk_size: int
+    :returns: Enriched log
+    :rtype: DataFrame
+    """
+
+    screenshot_filenames, missing_json_file = check_metadata_json_exists(ui_log_path, screenshot_colname, metadata_json_root)
+
+    if missing_json_file or (not skip):
+        # load json and create model, and load weights into new model
+        # The model is loaded once per worker process and shared by the families that use it
+        loaded_model = model_registry.get_legacy_classifier(model, model_properties)
+
+        crop_store = CropStore(ui_elements_crops_npy_root)
+        component_store = ComponentStore(metadata_json_root)
+        chunks = legacy_preprocessed_crops_chunks(crop_store, component_store, screenshot_filenames, ui_elements_classification_image_shape, keep_materialized_crops, chunk_size)
+
+        for chunk in tqdm(chunks, total=int(np.ceil(len(screenshot_filenames) / chunk_size)), desc=f"Classifying images in {ui_elements_crops_npy_root}"):
+            # The crops of all the screenshots of the chunk are classified together
+            crops_number = [len(preprocessed_crops) for _, preprocessed_crops, _ in chunk]
+            if sum(crops_number) > 0:
+                predict_x = loaded_model.predict(np.concatenate([preprocessed_crops for _, preprocessed_crops, _ in chunk if len(preprocessed_crops) > 0]), batch_size=batch_size)
+                # This neural network returns as output a integer indicating each of its classes. This number must me mapped to its corresponding class name (str)
+                results = np.split(np.argmax(predict_x, axis=1), np.cumsum(crops_number)[:-1])
+            else:
+                results = [[] for _ in chunk]
+
+            # Update the classes of the components of the whole chunk at once
+            component_store.set_classes([(screenshot_filename, [text_classname if text_crops[index] else ui_elements_classification_classes[x] for index, x in enumerate(result)])
+                                         for (screenshot_filename, _, text_crops), result in zip(chunk, results)])
+
+        # Table with the components of all the screenshots (now with their classes), for the analysis of the results
+        export_components_parquet(metadata_json_root)
@@ -0,0 +1,335 @@
+import os
+import json
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+"""
+Consolidated storage of the GUI components metadata of a family
+
+All the components detected in the screenshots of a family are kept in one SQLite file ('components.sqlite3', inside
+the components json folder), with one row per component: screenshot, position, id, class, text and box. Detection
+inserts the components of each screenshot (and the words recognized by OCR in it), classification updates their
+classes and feature extraction the features of the screenshots, always in bulk, so the metadata of every screenshot is no longer parsed and serialized again by
+each phase.
+
+The '<screenshot>.json' files are still exported for compatibility (see 'export_components_json'), and folders written
+by previous versions, which only have those files, are imported into the store when their screenshots are read.
+
+After detection and classification, the components are also exported to a Parquet table ('components.parquet'), sorted
+by screenshot, to be queried by the analysis of the results: it is read memory-mapped, and the filters over its columns
+skip the row groups which statistics do not match (see 'read_components_table').
+"""
+
+store_filename = "components.sqlite3"
+parquet_filename = "components.parquet"
+parquet_row_group_size = 65536
+compos_columns = ("id", "class", "Text", "column_min", "row_min", "column_max", "row_max", "width", "height")
+parquet_schema = pa.schema([
+    ("screenshot", pa.string()),
+    ("id", pa.int64()),
+    ("class", pa.string()),
+    ("text", pa.string()),
+    ("column_min", pa.int64()),
+    ("row_min", pa.int64()),
+    ("column_max", pa.int64()),
+    ("row_max", pa.int64()),
+    ("width", pa.int64()),
+    ("height", pa.int64()),
+])
+
+schema = """
+CREATE TABLE IF NOT EXISTS screenshots (
+    name TEXT PRIMARY KEY,
+    img_shape TEXT NOT NULL,
+    has_text INTEGER NOT NULL,
+    features TEXT
+);
+CREATE TABLE IF NOT EXISTS components (
+    screenshot TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id INTEGER,
+    class TEXT,
+    text TEXT,
+    column_min INTEGER,
+    row_min INTEGER,
+    column_max INTEGER,
+    row_max INTEGER,
+    width INTEGER,
+    height INTEGER,
+    PRIMARY KEY (screenshot, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS words (
+    screenshot TEXT PRIMARY KEY,
+    words TEXT NOT NULL
+);
+"""
+
+
+class ComponentStore:
+
+    def __init__(self, root):
+        """
+        :param root: Folder of the store (the components json folder), ending with the path separator
+        :type root: str
+        """
+        self.root = root
+        self.path = root + store_filename
+        self._connection = None
+        self._pid = None
+        # the classification pipeline reads and writes the store from different threads
+        self._lock = threading.RLock()
+        if not os.path.exists(root):
+            os.makedirs(root, exist_ok=True)
+
+    def connection(self):
+        # connections are not shared with the processes forked after opening them (detection workers)
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+            # WAL lets the detection workers insert screenshots while others are being read
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(schema)
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def legacy_path(self, name):
+        return self.root + name + ".json"
+
+    def screenshots(self):
+        """
+        :returns: Names of the screenshots in the store
+        :rtype: set
+        """
+        with self._lock:
+            return {row[0] for row in self.connection().execute("SELECT name FROM screenshots")}
+
+    def __contains__(self, name):
+        with self._lock:
+            stored = self.connection().execute("SELECT 1 FROM screenshots WHERE name = ?", (name,)).fetchone() is not None
+        return stored or os.path.exists(self.legacy_path(name))
+
+    def put(self, name, compos_json):
+        """
+        Stores the components of a screenshot, replacing the ones it had (along with their classes and features)
+
+        :param name: Screenshot name
+        :type name: str
+        :param compos_json: Components of the screenshot, in the format of the components json
+        :type compos_json: dict
+        """
+        has_text = any("Text" in compo for compo in compos_json["compos"])
+        rows = [(name, position, compo.get("id"), compo.get("class"), compo.get("Text"), compo["column_min"], compo["row_min"],
+                 compo["column_max"], compo["row_max"], compo["width"], compo["height"])
+                for position, compo in enumerate(compos_json["compos"])]
+        features = json.dumps(compos_json["features"]) if "features" in compos_json else None
+        with self._lock, self.connection() as connection:
+            connection.execute("DELETE FROM components WHERE screenshot = ?", (name,))
+            connection.execute("INSERT OR REPLACE INTO screenshots VALUES (?, ?, ?, ?)",
+                               (name, json.dumps(compos_json["img_shape"]), int(has_text), features))
+            connection.executemany("INSERT INTO components VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def import_legacy(self, name):
+        with open(self.legacy_path(name), 'r') as f:
+            self.put(name, json.load(f))
+
+    def get(self, name):
+        """
+        :returns: Components of the screenshot, in the format of the components json
+        :rtype: dict
+        """
+        with self._lock:
+            connection = self.connection()
+            screenshot = connection.execute("SELECT img_shape, has_text, features FROM screenshots WHERE name = ?", (name,)).fetchone()
+            if screenshot is None:
+                self.import_legacy(name)
+                return self.get(name)
+            rows = connection.execute("SELECT " + ", ".join(compos_columns) + " FROM components WHERE screenshot = ? ORDER BY position", (name,)).fetchall()
+        return self.compos_json(screenshot, rows)
+
+    @staticmethod
+    def compos_json(screenshot, rows):
+        img_shape, has_text, features = screenshot
+        columns = compos_columns if has_text else tuple(c for c in compos_columns if c != "Text")
+        if not has_text:
+            rows = [row[:2] + row[3:] for row in rows]
+        data = {"img_shape": json.loads(img_shape), "compos": [dict(zip(columns, row)) for row in rows]}
+        if features is not None:
+            data["features"] = json.loads(features)
+        return data
+
+    def set_classes(self, classes):
+        """
+        Updates the class of the components of several screenshots in one transaction
+
+        :param classes: Pairs of (screenshot name, classes of its components in order)
+        :type classes: iterable
+        """
+        rows = [(c, name, position) for name, screenshot_classes in classes for position, c in enumerate(screenshot_classes)]
+        with self._lock, self.connection() as connection:
+            connection.executemany("UPDATE components SET class = ? WHERE screenshot = ? AND position = ?", rows)
+
+    def set_features(self, features):
+        """
+        Updates the features of several screenshots in one transaction
+
+        :param features: Pairs of (screenshot name, features dict)
+        :type features: iterable
+        """
+        rows = [(json.dumps(screenshot_features), name) for name, screenshot_features in features]
+        with self._lock, self.connection() as connection:
+            connection.executemany("UPDATE screenshots SET features = ? WHERE name = ?", rows)
+
+    def set_words(self, words):
+        """
+        Stores the words recognized by OCR in several screenshots in one transaction
+
+        :param words: Pairs of (screenshot name, list of words)
+        :type words: iterable
+        """
+        rows = [(name, json.dumps(screenshot_words)) for name, screenshot_words in words]
+        with self._lock, self.connection() as connection:
+            connection.executemany("INSERT OR REPLACE INTO words VALUES (?, ?)", rows)
+
+    def words(self):
+        """
+        :returns: Dict which keys are the screenshots with stored words and which values are the lists of their words
+        :rtype: dict
+        """
+        with self._lock:
+            rows = self.connection().execute("SELECT screenshot, words FROM words").fetchall()
+        return {name: json.loads(screenshot_words) for name, screenshot_words in rows}
+
+    def import_missing(self, names):
+        """
+        Imports the screenshots which are only in the components json files written by previous versions
+        """
+        for name in set(names) - self.screenshots():
+            self.import_legacy(name)
+
+    def select(self, connection, names):
+        """
+        Fills the temporary table 'selected' of the connection with the given screenshots, so the queries only read
+        their rows (a list of parameters would exceed the limit of SQLite with the screenshots of a large log)
+        """
+        connection.execute("CREATE TEMP TABLE IF NOT EXISTS selected (name TEXT PRIMARY KEY)")
+        with connection:
+            connection.execute("DELETE FROM selected")
+            connection.executemany("INSERT OR IGNORE INTO selected VALUES (?)", ((name,) for name in names))
+
+    def class_counts(self, names):
+        """
+        :returns: Number of components of each class in each of the given screenshots, with columns screenshot, class and count
+        :rtype: DataFrame
+        """
+        self.import_missing(names)
+        with self._lock:
+            connection = self.connection()
+            self.select(connection, names)
+            return pd.read_sql_query("SELECT screenshot, class, COUNT(*) AS count FROM components WHERE screenshot IN (SELECT name FROM selected) "
+                                     "GROUP BY screenshot, class", connection)
+
+    def components_frame(self, names, columns):
+        """
+        :param columns: Columns of the components table to read
+        :type columns: list
+        :returns: Given columns of the components of the given screenshots, in the order of the screenshots
+        :rtype: DataFrame
+        """
+        self.import_missing(names)
+        with self._lock:
+            connection = self.connection()
+            self.select(connection, names)
+            return pd.read_sql_query("SELECT " + ", ".join(columns) + " FROM components WHERE screenshot IN (SELECT name FROM selected) "
+                                     "ORDER BY screenshot, position", connection)
+
+    def images_sizes(self, names):
+        """
+        :returns: Array of shape (N, 2) with the (height, width) of the screenshots in which their components were detected
+        :rtype: numpy.ndarray
+        """
+        self.import_missing(names)
+        with self._lock:
+            connection = self.connection()
+            self.select(connection, names)
+            img_shapes = dict(connection.execute("SELECT name, img_shape FROM screenshots WHERE name IN (SELECT name FROM selected)").fetchall())
+        # legacy detection stores the shape wrapped in a list
+        return np.array([np.array(json.loads(img_shapes[name])).reshape(-1)[:2] for name in names], dtype=np.int64).reshape(-1, 2)
+
+    def export_json(self):
+        """
+        Writes the components json of every screenshot of the store, as previous versions did in each phase
+        """
+        with self._lock:
+            connection = self.connection()
+            screenshots = connection.execute("SELECT name, img_shape, has_text, features FROM screenshots").fetchall()
+            rows = connection.execute("SELECT screenshot, " + ", ".join(compos_columns) + " FROM components ORDER BY screenshot, position").fetchall()
+        compos = {}
+        for row in rows:
+            compos.setdefault(row[0], []).append(row[1:])
+        for name, *screenshot in screenshots:
+            with open(self.legacy_path(name), "w") as f:
+                json.dump(self.compos_json(screenshot, compos.get(name, [])), f)
+
+    def export_parquet(self):
+        """
+        Writes all the components of the store to its Parquet table, one row per component sorted by screenshot (so the
+        row groups hold contiguous ranges of screenshots)
+        """
+        with self._lock:
+            rows = self.connection().execute("SELECT " + ", ".join(f.name for f in parquet_schema) +
+                                             " FROM components ORDER BY screenshot, position").fetchall()
+        columns = list(zip(*rows)) if rows else [[] for _ in parquet_schema]
+        table = pa.Table.from_arrays([pa.array(column, type=f.type) for column, f in zip(columns, parquet_schema)], schema=parquet_schema)
+        # the table is replaced at once, so it is never read half written
+        path = self.root + parquet_filename
+        pq.write_table(table, path + ".tmp", row_group_size=parquet_row_group_size)
+        os.replace(path + ".tmp", path)
+
+
+def read_components_table(components_json_root, columns=None, filters=None):
+    """
+    Reads the Parquet table with the components of a family
+
+    :param components_json_root: Path to the components json folder of the family, ending with the path separator
+    :type components_json_root: str
+    :param columns: Columns to read (all of them by default)
+    :type columns: list
+    :param filters: Predicates pushed down to the reader, e.g. [('class', '==', 'x0_Button')]
+    :type filters: list
+    :returns: Components table
+    :rtype: DataFrame
+    """
+    return pq.read_table(components_json_root + parquet_filename, columns=columns, filters=filters, memory_map=True).to_pandas()
+
+
+def export_components_parquet(components_json_root):
+    """
+    Exports the Parquet table of a family from its component store
+
+    :param components_json_root: Path to the components json folder of the family, ending with the path separator
+    :type components_json_root: str
+    """
+    store = ComponentStore(components_json_root)
+    store.export_parquet()
+    store.close()
+
+
+def export_components_json(components_json_root):
+    """
+    Exports the components json files of a family from its component store, if the family has one
+
+    :param components_json_root: Path to the components json folder of the family, ending with the path separator
+    :type components_json_root: str
+    """
+    if os.path.exists(components_json_root + store_filename):
+        store = ComponentStore(components_json_root)
+        store.export_json()
+        store.close()
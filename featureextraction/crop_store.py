@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import cv2
+import numpy as np
+from functools import lru_cache
+
+"""
+Compact storage of the GUI components crops of a family
+
+The crops of all the screenshots are appended to contiguous binary buffers ('crops-<shard>.bin') and located by an index
+of offsets, dtypes and shapes ('crops-<shard>.idx', one JSON line per screenshot). Each process writes its own shard, so
+several detection workers can store crops at the same time, and the crops are read through np.memmap without
+deserializing (or even reading) the crops of other screenshots.
+
+Folders written by previous versions (one pickled '<screenshot>.npy' per screenshot) are still readable.
+
+When detection runs with lazy crops, only the boxes of the components are stored (in the components json), and the
+crops are materialized when they are needed from the screenshot, which is placed in the parent folder of the store.
+"""
+
+buffer_extension = ".bin"
+index_extension = ".idx"
+# Number of decoded screenshots kept in memory to materialize crops
+screenshots_cache_size = 8
+
+
+def decoded_screenshot(path, height, width):
+    """
+    :returns: Read-only screenshot, resized to the given shape if detection worked over a resized copy (UIED)
+    :rtype: numpy.ndarray
+    """
+    # the cache lives as long as the worker process, and a case study generated again reuses the same paths
+    stat = os.stat(path)
+    return cached_decoded_screenshot(path, height, width, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=screenshots_cache_size)
+def cached_decoded_screenshot(path, height, width, mtime_ns, size):
+    img = cv2.imread(path)
+    if img.shape[:2] != (height, width):
+        img = cv2.resize(img, (width, height))
+    img.flags.writeable = False
+    return img
+
+
+def crop_components(screenshot_path, compos_json):
+    """
+    Crops the components of a screenshot with the boxes of its components json
+
+    :param screenshot_path: Path to the screenshot
+    :type screenshot_path: str
+    :param compos_json: Content of the components json of the screenshot
+    :type compos_json: dict
+    :returns: Read-only crops, in the same order as the components of the json
+    :rtype: list
+    """
+    # legacy detection stores the shape wrapped in a list
+    img_shape = np.array(compos_json['img_shape']).reshape(-1)
+    img = decoded_screenshot(screenshot_path, int(img_shape[0]), int(img_shape[1]))
+    return [img[compo['row_min']:compo['row_max'], compo['column_min']:compo['column_max']] for compo in compos_json['compos']]
+
+
+class CropStore:
+
+    def __init__(self, root):
+        """
+        :param root: Folder of the store, ending with the path separator
+        :type root: str
+        """
+        self.root = root
+        self._index = None
+        self._buffers = {}
+        if not os.path.exists(root):
+            os.makedirs(root, exist_ok=True)
+
+    def shard_path(self, shard, extension):
+        return self.root + "crops-" + str(shard) + extension
+
+    def index(self):
+        """
+        :returns: Dict which keys are the stored screenshots and which values are the shard and the list of (offset, dtype, shape) of their crops
+        :rtype: dict
+        """
+        if self._index is None:
+            latest = {}
+            for filename in os.listdir(self.root):
+                if filename.startswith("crops-") and filename.endswith(index_extension):
+                    shard = filename[len("crops-"):-len(index_extension)]
+                    with open(self.root + filename, 'r') as f:
+                        for line in f:
+                            entry = json.loads(line)
+                            # a screenshot detected again is appended, the last version is the valid one
+                            if entry['key'] not in latest or latest[entry['key']][0] < entry['seq']:
+                                latest[entry['key']] = (entry['seq'], shard, entry['crops'])
+            self._index = {key: (shard, crops) for key, (_, shard, crops) in latest.items()}
+        return self._index
+
+    def legacy_path(self, key):
+        return self.root + key + ".npy"
+
+    def __contains__(self, key):
+        return key in self.index() or os.path.exists(self.legacy_path(key))
+
+    def put(self, key, crops):
+        """
+        Appends the crops of a screenshot to the shard of this process
+
+        :param key: Screenshot name
+        :type key: str
+        :param crops: Crops of the screenshot
+        :type crops: list
+        """
+        shard = os.getpid()
+        entries = []
+        with open(self.shard_path(shard, buffer_extension), 'ab') as f:
+            offset = f.tell()
+            for crop in crops:
+                crop = np.ascontiguousarray(crop)
+                f.write(crop.tobytes())
+                entries.append([offset, crop.dtype.str, list(crop.shape)])
+                offset += crop.nbytes
+        # the index line is written once the crops are in the buffer, so an interrupted write is never indexed
+        entry = {'key': key, 'seq': time.time_ns(), 'crops': entries}
+        with open(self.shard_path(shard, index_extension), 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+        if self._index is not None:
+            self._index[key] = (str(shard), entries)
+        self._buffers.pop(str(shard), None)
+
+    def buffer(self, shard):
+        if shard not in self._buffers:
+            path = self.shard_path(shard, buffer_extension)
+            self._buffers[shard] = np.memmap(path, dtype=np.uint8, mode='r') if os.path.getsize(path) > 0 else np.empty(0, dtype=np.uint8)
+        return self._buffers[shard]
+
+    def get(self, key):
+        """
+        :returns: Read-only crops of the screenshot, mapped from the store buffer
+        :rtype: list
+        """
+        if key not in self.index():
+            return list(np.load(self.legacy_path(key), allow_pickle=True))
+        shard, entries = self.index()[key]
+        crops = []
+        for offset, dtype, shape in entries:
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            if count == 0:
+                crops.append(np.empty(shape, dtype=dtype))
+            else:
+                crops.append(np.frombuffer(self.buffer(shard), dtype=dtype, count=count, offset=offset).reshape(shape))
+        return crops
+
+    def materialize(self, key, compos_json, keep=False):
+        """
+        Crops of the screenshot, read from the store or, if they were not stored by detection (lazy crops), cropped
+        from the screenshot
+
+        :param compos_json: Content of the components json of the screenshot
+        :type compos_json: dict
+        :param keep: Add to the store the crops materialized from the screenshot
+        :type keep: bool
+        :rtype: list
+        """
+        if key in self:
+            return self.get(key)
+        crops = crop_components(os.path.dirname(os.path.normpath(self.root)) + os.sep + key, compos_json)
+        if keep:
+            self.put(key, crops)
+        return crops
+
+    def clear(self):
+        """
+        Removes all the crops of the store, including the ones written by previous versions ('<key>.npy'), which would
+        be returned instead of the crops of the new detection. The text flags of the crops ('_texts.npy') are kept
+        """
+        for filename in os.listdir(self.root):
+            if filename.startswith("crops-") and (filename.endswith(buffer_extension) or filename.endswith(index_extension)):
+                os.remove(self.root + filename)
+            elif filename.endswith(".npy") and not filename.endswith("_texts.npy"):
+                os.remove(self.root + filename)
+        self._index = {}
+        self._buffers = {}
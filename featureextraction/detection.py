@@ -1,514 +1,679 @@
-import json
-import numpy as np
-import keras_ocr
-import cv2
-import pandas as pd
-import matplotlib.pyplot as plt
-from os.path import join as pjoin
-import os
-import featureextraction.utils as utils
-import os
-import cv2
-import pandas as pd
-import numpy as np
-from rim.settings import cropping_threshold, platform_name, detection_phase_name
-from art import tprint
-import pickle
-from tqdm import tqdm
-from featureextraction.gaze_analysis import gaze_events_associated_to_event_time_range
-
-"""
-Text boxes detection: KERAS_OCR
-
-In order to detect the text boxes inside the screenshots, we define the get_keras_ocr_image.
-This function has a list of images as input, and a list of lists with the coordinates of text boxes coordinates
-"""
-
-def get_ocr_image(pipeline, param_img_root, images_input):
-    """
-    Applies Keras-OCR over the input image or images to extract plain text and the coordinates corresponding
-    to the present words
-
-    :param pipeline: keras pipeline
-    :type pipeline: keras pipeline
-    :param param_img_root: Path where the imaages associated to each log row are stored
-    :type param_img_root: str
-    :param images_input: Path or list of paths of the image/s to process
-    :type images_input: str or list
-    :returns: List of lists corresponding the words identified in the input. Example: ('delete', array([[1161.25,  390.  ], [1216.25,  390.  ], [1216.25,  408.75], [1161.25,  408.75]], dtype=float32))
-    :rtype: list
-    """
-
-    if not isinstance(images_input, list):
-        # print("Solamente una imagen como entrada")
-        images_input = [images_input]
-
-    # Get a set of three example images
-    images = [
-        keras_ocr.tools.read(param_img_root + path) for path in images_input
-    ]
-    # Each list of predictions in prediction_groups is a list of
-    # (word, box) tuples.
-    prediction_groups = pipeline.recognize(images)
-    # Plot the predictions
-    # fig, axs = plt.subplots(nrows=len(images), figsize=(20, 20))
-    # for ax, image, predictions in zip(axs, images, prediction_groups):
-    #     keras_ocr.tools.drawAnnotations(image=image, predictions=predictions, ax=ax)
-    return prediction_groups
-
-
-def nesting_inspection(org, grey, compos, ffl_block):
-    '''
-    Inspect all big compos through block division by flood-fill
-    :param ffl_block: gradient threshold for flood-fill
-    :return: nesting compos
-    '''
-    nesting_compos = []
-    for i, compo in enumerate(compos):
-        if compo.height > 50:
-            replace = False
-            clip_grey = compo.compo_clipping(grey)
-            n_compos = utils.nested_components_detection(
-                clip_grey, org, grad_thresh=ffl_block, show=False)
-
-            for comp in n_compos:
-                comp.compo_relative_position(
-                    compo.bbox.col_min, compo.bbox.row_min)
-
-            for n_compo in n_compos:
-                if n_compo.redundant:
-                    compos[i] = n_compo
-                    replace = True
-                    break
-            if not replace:
-                nesting_compos += n_compos
-    return nesting_compos
-
-
-def get_uied_gui_components_crops(input_imgs_path, image_names, img_index):
-    '''
-    Analyzes an image and extracts its UI components with an alternative algorithm type
-
-    :param param_img_root: Path to the image
-    :type param_img_root: str
-    :param image_names: Names of the images in the path
-    :type image_names: list
-    :param img_index: Index of the image we want to analyze in images_names
-    :type img_index: int
-    :return: List of image crops and Dict object with components detected
-    :rtype: Tuple
-    '''
-    resize_by_height = 800
-    input_img_path = pjoin(input_imgs_path, image_names[img_index])
-
-    '''
-    ele:min-grad: gradient threshold to produce binary map         
-    ele:ffl-block: fill-flood threshold
-    ele:min-ele-area: minimum area for selected elements 
-    ele:merge-contained-ele: if True, merge elements contained in others
-    text:max-word-inline-gap: words with smaller distance than the gap are counted as a line
-    text:max-line-gap: lines with smaller distance than the gap are counted as a paragraph
-
-    Tips:
-    1. Larger *min-grad* produces fine-grained binary-map while prone to over-segment element to small pieces
-    2. Smaller *min-ele-area* leaves tiny elements while prone to produce noises
-    3. If not *merge-contained-ele*, the elements inside others will be recognized, while prone to produce noises
-    4. The *max-word-inline-gap* and *max-line-gap* should be dependent on the input image size and resolution
-    '''
-    uied_params = {
-        'min-grad': 3,
-        'ffl-block': 5,
-        'min-ele-area': 25,
-        'merge-contained-ele': True,
-        'max-word-inline-gap': 4,
-        'max-line-gap': 4
-    }
-
-    # ##########################
-    # COMPONENT DETECTION
-    # ##########################
-
-    # *** Step 1 *** pre-processing: read img -> get binary map
-    org, grey = utils.read_img(input_img_path, resize_by_height)
-    binary = utils.binarization(org, grad_min=int(uied_params['min-grad']))
-
-    # *** Step 2 *** element detection
-    utils.rm_line(binary, show=False, wait_key=0)
-    uicompos = utils.component_detection(
-        binary, min_obj_area=int(uied_params['min-ele-area']))
-
-    # *** Step 3 *** results refinement
-    uicompos = utils.compo_filter(uicompos, min_area=int(
-        uied_params['min-ele-area']), img_shape=binary.shape)
-    uicompos = utils.merge_intersected_compos(uicompos)
-    utils.compo_block_recognition(binary, uicompos)
-    if uied_params['merge-contained-ele']:
-        uicompos = utils.rm_contained_compos_not_in_block(uicompos)
-    utils.compos_update(uicompos, org.shape)
-    utils.compos_containment(uicompos)
-
-    # *** Step 4 ** nesting inspection: check if big compos have nesting element
-    uicompos += nesting_inspection(org, grey,
-                                   uicompos, ffl_block=uied_params['ffl-block'])
-    utils.compos_update(uicompos, org.shape)
-
-    # ##########################
-    # RESULTS
-    # ##########################
-
-    # *** Step 5 *** save detection result
-    utils.compos_update(uicompos, org.shape)
-
-    clips = [compo.compo_clipping(org) for compo in uicompos]
-
-    return clips, uicompos
-
-
-def get_gui_components_crops(param_img_root, image_names, texto_detectado_ocr, path_to_save_bordered_images, add_words_columns, img_index):
-    '''
-    Analyzes an image and extracts its UI components
-
-    :param param_img_root: Path to the image
-    :type param_img_root: str
-    :param image_names: Names of the images in the path
-    :type image_names: list
-    :param texto_detectado_ocr: Text detected by OCR in previous step
-    :type texto_detectado_ocr: list
-    :param path_to_save_bordered_images: Path to save the image along with the components detected
-    :type path_to_save_bordered_images: str
-    :param add_words_columns: Save words detected by OCR
-    :type add_words_columns: bool
-    :param img_index: Index of the image we want to analyze in images_names
-    :type img_index: int
-    :return: Crops and text inside components
-    :rtype: Tuple
-    '''
-    words = {}
-    words_columns_names = {}
-
-    image_path = param_img_root + image_names[img_index]
-    # Read the image
-    img = cv2.imread(image_path)
-    img_copy = img.copy()
-    # cv2_imshow(img_copy)
-
-    # Store on global_y all the "y" coordinates and text boxes
-    # Each row is a different text box, much more friendly than the format returned by keras_ocr 
-    global_y = []
-    global_x = []
-    words[img_index] = {}
-
-    for j in range(0, len(texto_detectado_ocr[img_index])):
-        coordenada_y = []
-        coordenada_x = []
-
-        for i in range(0, len(texto_detectado_ocr[img_index][j][1])):
-            coordenada_y.append(texto_detectado_ocr[img_index][j][1][i][1])
-            coordenada_x.append(texto_detectado_ocr[img_index][j][1][i][0])
-
-        if add_words_columns:
-            word = texto_detectado_ocr[img_index][j][0]
-            centroid = (np.mean(coordenada_x), np.mean(coordenada_y))
-            if word in words[img_index]:
-                words[img_index][word] += [centroid]
-            else:
-                words[img_index][word] = [centroid]
-
-            if word in words_columns_names:
-                words_columns_names[word] += 1
-            else:
-                words_columns_names[word] = 1
-
-        global_y.append(coordenada_y)
-        global_x.append(coordenada_x)
-        # print('Coord y, cuadro texto ' +str(j+1)+ str(global_y[j]))
-        # print('Coord x, cuadro texto ' +str(j+1)+ str(global_x[j]))
-
-    # print("Number of text boxes detected (iteration " + str(img_index) + "): " + str(len(texto_detectado_ocr[img_index])))
-
-    # Interval calculation of the text boxes
-    intervalo_y = []
-    intervalo_x = []
-    for j in range(0, len(global_y)):
-        intervalo_y.append([int(max(global_y[j])), int(min(global_y[j]))])
-        intervalo_x.append([int(max(global_x[j])), int(min(global_x[j]))])
-    # print("Intervalo y", intervalo_y)
-    # print("Intervalo x", intervalo_x)
-
-    # Conversion to grey Scale
-    gris = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    # cv2_imshow(gris)
-
-    # Gaussian blur
-    gauss = cv2.GaussianBlur(gris, (5, 5), 0)
-    # cv2_imshow(gauss)
-
-    # Border detection with Canny
-    canny = cv2.Canny(gauss, 50, 150)
-    # cv2_imshow(canny)
-
-    # Countour search in the image
-    (contornos, _) = cv2.findContours(canny.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    # print("Number of GUI components detected: ", len(contornos), "\n")
-
-    # draw the countours on the image
-    cv2.drawContours(img_copy, contornos, -1, (0, 0, 255), 2)
-    # cv2_imshow(img_copy)
-    cv2.imwrite(path_to_save_bordered_images + image_names[img_index] + '_bordered.png', img_copy)
-
-    # We carry out the crops for each detected countour
-    recortes = []
-    lista_para_no_recortar_dos_veces_mismo_gui = []
-
-    text_or_not_text = []
-
-    comp_json = {"img_shape": [img.shape], "compos": []}
-
-    for j in range(0, len(contornos)):
-        cont_horizontal = []
-        cont_vertical = []
-        # Obtain x and y max and min values of the countour
-        for i in range(0, len(contornos[j])):
-            cont_horizontal.append(contornos[j][i][0][0])
-            cont_vertical.append(contornos[j][i][0][1])
-        x = min(cont_horizontal)
-        w = max(cont_horizontal)
-        y = min(cont_vertical)
-        h = max(cont_vertical)
-        #print('Coord x, componente' + str(j+1) + '  ' + str(x) + ' : ' + str(w))
-        #print('Coord y, componente' + str(j+1) + '  ' + str(y) + ' : ' + str(h))
-
-        # Check that the countours are not overlapping with text boxes. If so, cut the text boxes
-        condicion_recorte = True
-        no_solapa = 1
-        for k in range(0, len(intervalo_y)):
-            solapa_y = 0
-            solapa_x = 0
-            y_min = min(intervalo_y[k])-cropping_threshold
-            y_max = max(intervalo_y[k])+cropping_threshold
-            x_min = min(intervalo_x[k])-cropping_threshold
-            x_max = max(intervalo_x[k])+cropping_threshold
-            # and max([y-y_min, y_max-y, h-y_min, y_max-h])<=surrounding_max_diff
-            solapa_y = (y_min <= y <= y_max) or (y_min <= h <= y_max)
-            # and max([x-x_min, x_max-x, w-x_min, x_max-w])<=surrounding_max_diff
-            solapa_x = (x_min <= x <= x_max) or (x_min <= w <= x_max)
-            if (solapa_y and solapa_x):
-                if (lista_para_no_recortar_dos_veces_mismo_gui.count(k) == 0):
-                    lista_para_no_recortar_dos_veces_mismo_gui.append(k)
-                else:
-                    # print("Text inside GUI component " + str(k) + " twice")
-                    condicion_recorte = False
-                x = min(intervalo_x[k])
-                w = max(intervalo_x[k])
-                y = min(intervalo_y[k])
-                h = max(intervalo_y[k])
-                no_solapa *= 0
-                #crop_img = img[min(intervalo_y[k]) : max(intervalo_y[k]), min(intervalo_x[k]) : max(intervalo_x[k])]
-                #print("Componente " + str(j+1) + " solapa con cuadro de texto")
-        # if (solapa_y == 1 and solapa_x == 1):
-        #crop_img = img[min(intervalo_y[k]) : max(intervalo_y[k]), min(intervalo_x[k]) : max(intervalo_x[k])]
-        #print("Componente " + str(j+1) + " solapa con cuadro de texto")
-        # recortes.append(crop_img)
-        # else:
-        # If the GUI component overlaps with the textbox, cut the later one
-        # gaze_point_x and gaze_point_x >= x and gaze_point_x <= w and gaze_point_y >= y and gaze_point_y <= h and duration >= gaze_analysis_threshold
-        coincidence_with_attention_point = True
-        if (condicion_recorte and coincidence_with_attention_point):
-            crop_img = img[y:h, x:w]
-            text = [word for word in words[img_index] if len([coord for coord in words[img_index][word] if x <= coord[0] <= w and y <= coord[1] <= h]) > 0]
-            is_text = True if len(text)>0 else False
-            comp_json["compos"].append({
-                "id": int(j+1),
-                "class": "Text" if is_text else "Compo",
-                "Text": text[0] if is_text else None,
-                "column_min": int(x),
-                "row_min": int(y),
-                "column_max": int(w),
-                "row_max": int(h),
-                "width": int(w - x),
-                "height": int(h - y)
-            })
-            recortes.append(crop_img)
-            text_or_not_text.append(abs(no_solapa-1))
-
-    return (recortes, comp_json, text_or_not_text, words)
-
-def detect_images_components(param_img_root, log, special_colnames, skip, image_names, text_detected_by_OCR, path_to_save_bordered_images, add_words_columns, algorithm):
-    """
-    With this function we process the screencaptures using the information resulting by aplying OCR
-    and the image itself. We crop the GUI components and store them in a numpy array with all the 
-    cropped components for each of the images in images_names
-
-
-    :param param_img_root: Path where the imaages associated to each log row are stored
-    :type param_img_root: str
-    :image_names: Names of images in the log by alphabetical order
-    :type image_names: list
-    :texto_detectado_ocr: List of lists corresponding the words identified in the images on the log file
-    :type texto_detectado_ocr: list
-    :path_to_save_bordered_images: Path where the images along with their component borders must be stored
-    :type path_to_save_bordered_images: str
-    """
-    path_to_save_gui_components_npy = param_img_root+"components_npy/"
-    path_to_save_components_json = param_img_root+"components_json/"
-
-    # Iterate over the list of images
-    for img_index in tqdm(range(0, len(image_names)), desc=f"Getting crops for {param_img_root}"):
-        screenshot_texts_npy = path_to_save_gui_components_npy + image_names[img_index] + "_texts.npy"
-        screenshot_npy = path_to_save_gui_components_npy + image_names[img_index] + ".npy"
-        exists_screenshot_npy = os.path.exists(screenshot_npy)
-
-        screenshot_json = path_to_save_components_json + image_names[img_index] + ".json"
-        exists_screenshot_json = os.path.exists(screenshot_json)
-        
-        overwrite = (not exists_screenshot_json) or (not exists_screenshot_npy) or (not skip)
-
-        # Gaze analysis?
-
-        if overwrite:
-
-            if algorithm == "rpa-us":
-                recortes, comp_json, text_or_not_text, words = get_gui_components_crops(param_img_root, image_names, text_detected_by_OCR, path_to_save_bordered_images, add_words_columns, img_index)
-                
-                # save metadata json
-                with open(path_to_save_components_json + image_names[img_index] + '.json', "w") as outfile:
-                    json.dump(comp_json, outfile)
-
-                # save ui elements npy
-                aux = np.array(recortes)
-                np.save(screenshot_npy, aux)
-
-                # save texts npy
-                np.save(screenshot_texts_npy, text_or_not_text)
-
-            elif algorithm == "uied":
-                # this method edit the metadata json with the ui element class and text if corresponds 
-                recortes, uicompos = get_uied_gui_components_crops(param_img_root, image_names, img_index)
-
-                # store all bounding boxes from the ui elements that are in 'uicompos'
-                utils.save_corners_json(path_to_save_components_json + image_names[img_index] + '.json', uicompos)
-
-                # save ui elements npy
-                aux = np.array(recortes, dtype=object)
-                np.save(screenshot_npy, aux)
-
-            # if (add_words_columns and (not no_modification)) or (add_words_columns and (not os.path.exists(param_img_root+"text_colums.csv"))):
-            #     storage_text_info_as_dataset(words, image_names, log, param_img_root)
-
-
-# def storage_text_info_as_dataset(words, image_names, log, param_img_root):
-#     headers = []
-#     for w in words[1]:
-#         if words[1][w] == 1:
-#             headers.append(w)
-#         else:
-#             [headers.append(w+"_"+str(i)) for i in range(1, words[1][w]+1)]
-#     initial_row = ["NaN"]*len(headers)
-
-#     df = pd.DataFrame([], columns=headers)
-#     words = words[0]
-
-#     for j in range(0, len(image_names)):
-#         for w in words[j]:
-#             centroid_ls = list(words[j][w])
-#             if len(centroid_ls) == 1:
-#                 if w in headers:
-#                     pos = headers.index(w)
-#                 else:
-#                     pos = headers.index(w+"_1")
-#                     initial_row[pos] = centroid_ls[0]
-#             else:
-#                 ac = 0
-#                 for index, h in enumerate(headers):
-#                     if len(centroid_ls) > ac and (str(w) in h):
-#                         initial_row[index] = centroid_ls[ac]
-#                         ac += 1
-#         df.loc[j] = initial_row
-
-#     log_enriched = log.join(df).fillna(method='ffill')
-#     log_enriched.to_csv(param_img_root+"text_colums.csv")
-
-
-"""
-GUI component detection
-
-The objective of this section is to be able to detect, define and crop each
-of the graphic components (Symbols, images or text boxes) that form constitute
-a screenshot
-
-Libraries Import: We will use mainly keras_ocr and Opencv (Cv2).
-=====================================
-Border detection and cropping: OpenCV
-
-We make use of OpenCV to carry out the following tasks:
-- Image read.
-- Calculation of intervals occupied by the text boxes obtained from keras_ocr
-- Image processing:
-    > GreyScale conversion
-    > Gaussian blur
-    > **Canny algorithm** for border detection
-    > Countour detection
-- Comparison betweeen countour and text boxes, giving more importance to text boxes 
-    in case there is overlapping
-- Final crop of each of the components
-
-"""
-
-
-def ui_elements_detection(param_log_path, param_img_root, special_colnames, add_words_columns=False, skip=False, algorithm="legacy"):
-    tprint(platform_name + " - " + detection_phase_name, "fancy60")
-    print(param_img_root+"\n")
-    
-    # Log read
-    log = pd.read_csv(param_log_path, sep=",")
-    # Extract the names of the screenshots associated to each of the rows in the log
-    image_names = log.loc[:, special_colnames["Screenshot"]].values.tolist()
-    pipeline = keras_ocr.pipeline.Pipeline()
-    file_exists = os.path.exists(param_img_root + "images_ocr_info.txt")
-
-    if file_exists:
-        print("\n\nReading images OCR info from file...")
-        with open(param_img_root + "images_ocr_info.txt", "rb") as fp:   # Unpickling
-            text_corners = pickle.load(fp)
-    else:
-        text_corners = []
-        for img in image_names:
-            ocr_result = get_ocr_image(pipeline, param_img_root, img)
-            text_corners.append(ocr_result[0])
-        with open(param_img_root + "images_ocr_info.txt", "wb") as fp:  # Pickling
-            pickle.dump(text_corners, fp)
-
-    # print(len(text_corners))
-
-    bordered = param_img_root+"contours/"
-    components_npy = param_img_root+"components_npy/"
-    components_json = param_img_root+"components_json/"
-    for p in [bordered, components_npy, components_json]:
-        if not os.path.exists(p):
-            os.mkdir(p)
-
-    detect_images_components(param_img_root, log, special_colnames, skip, image_names, text_corners, bordered, add_words_columns, algorithm)
-
-
-
-############################################
-############# Development utils ############
-############################################
-
-def check_npy_components_of_capture(image_name="1.png.npy", image_path="media/screenshots/components_npy/", interactive=False):
-    if interactive:
-        image_path = input("Enter path to images numpy arrays location: ")
-        image_name = input("Enter numpy array file name: ")
-    recortes = np.load(image_path+image_name, allow_pickle=True)
-    for i in range(0, len(recortes)):
-        print("Length: " + str(len(recortes)))
-        if recortes[i].any():
-            print("\nComponent: ", i+1)
-            plt.imshow(recortes[i], interpolation='nearest')
-            plt.show()
-        else:
-            print("Empty component")
-    if interactive:
-        image_path = input(
-            "Do you want to check another image components? Indicate another npy file name: ")
+import json
+import numpy as np
+import keras_ocr
+import cv2
+import pandas as pd
+import matplotlib.pyplot as plt
+from os.path import join as pjoin
+import os
+import multiprocessing
+import billiard
+import featureextraction.utils as utils
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+import featureextraction.model_registry as model_registry
+from featureextraction.ocr_cache import OCRStore
+from featureextraction.crop_store import CropStore
+from featureextraction.component_store import ComponentStore, export_components_parquet
+from featureextraction.spatial_index import WordsIndex
+import os
+import cv2
+import pandas as pd
+import numpy as np
+from rim.utils import file_sha256
+from rim.settings import cropping_threshold, platform_name, detection_phase_name, ocr_cache_location
+from art import tprint
+from PIL import Image
+from tqdm import tqdm
+from featureextraction.gaze_analysis import gaze_events_associated_to_event_time_range
+
+"""
+Text boxes detection: KERAS_OCR
+
+In order to detect the text boxes inside the screenshots, we define the get_keras_ocr_image.
+This function has a list of images as input, and a list of lists with the coordinates of text boxes coordinates
+"""
+
+def get_ocr_image(pipeline, param_img_root, images_input):
+    """
+    Applies Keras-OCR over the input image or images to extract plain text and the coordinates corresponding
+    to the present words
+
+    :param pipeline: keras pipeline
+    :type pipeline: keras pipeline
+    :param param_img_root: Path where the imaages associated to each log row are stored
+    :type param_img_root: str
+    :param images_input: Path or list of paths of the image/s to process
+    :type images_input: str or list
+    :returns: List of lists corresponding the words identified in the input. Example: ('delete', array([[1161.25,  390.  ], [1216.25,  390.  ], [1216.25,  408.75], [1161.25,  408.75]], dtype=float32))
+    :rtype: list
+    """
+
+    if not isinstance(images_input, list):
+        # print("Solamente una imagen como entrada")
+        images_input = [images_input]
+
+    # Get a set of three example images
+    images = [
+        keras_ocr.tools.read(param_img_root + path) for path in images_input
+    ]
+    # Each list of predictions in prediction_groups is a list of
+    # (word, box) tuples.
+    prediction_groups = pipeline.recognize(images)
+    # Plot the predictions
+    # fig, axs = plt.subplots(nrows=len(images), figsize=(20, 20))
+    # for ax, image, predictions in zip(axs, images, prediction_groups):
+    #     keras_ocr.tools.drawAnnotations(image=image, predictions=predictions, ax=ax)
+    return prediction_groups
+
+
+def get_ocr_images_batched(pipeline, param_img_root, image_names, batch_size=8, bucket_by_size=True):
+    """
+    Applies Keras-OCR over all the input images grouping them in batches, so each call to the pipeline recognizes
+    several images at once. Since the pipeline pads all the images of a batch to the biggest one, the images can be
+    bucketed by size before making the batches
+
+    :param pipeline: keras pipeline
+    :type pipeline: keras pipeline
+    :param param_img_root: Path where the imaages associated to each log row are stored
+    :type param_img_root: str
+    :param image_names: Names of the images to process
+    :type image_names: list
+    :param batch_size: Maximum number of images recognized in each call to the pipeline
+    :type batch_size: int
+    :param bucket_by_size: Only group in the same batch images with the same size
+    :type bucket_by_size: bool
+    :returns: List with the words identified in each of the input images, in the same order as image_names
+    :rtype: list
+    """
+    buckets = {}
+    for index, img in enumerate(image_names):
+        key = None
+        if bucket_by_size:
+            # Only the header of the image is read to get its size
+            with Image.open(param_img_root + img) as im:
+                key = im.size
+        if key in buckets:
+            buckets[key].append(index)
+        else:
+            buckets[key] = [index]
+
+    batches = [bucket[i:i + batch_size] for bucket in buckets.values() for i in range(0, len(bucket), batch_size)]
+
+    prediction_groups = [None] * len(image_names)
+    for batch in tqdm(batches, desc=f"Applying OCR to {param_img_root}"):
+        batch_predictions = get_ocr_image(pipeline, param_img_root, [image_names[index] for index in batch])
+        for index, predictions in zip(batch, batch_predictions):
+            prediction_groups[index] = predictions
+    return prediction_groups
+
+
+def nesting_inspection(org, grey, compos, ffl_block):
+    '''
+    Inspect all big compos through block division by flood-fill
+    :param ffl_block: gradient threshold for flood-fill
+    :return: nesting compos
+    '''
+    nesting_compos = []
+    for i, compo in enumerate(compos):
+        if compo.height > 50:
+            replace = False
+            clip_grey = compo.compo_clipping(grey)
+            n_compos = utils.nested_components_detection(
+                clip_grey, org, grad_thresh=ffl_block, show=False)
+
+            for comp in n_compos:
+                comp.compo_relative_position(
+                    compo.bbox.col_min, compo.bbox.row_min)
+
+            for n_compo in n_compos:
+                if n_compo.redundant:
+                    compos[i] = n_compo
+                    replace = True
+                    break
+            if not replace:
+                nesting_compos += n_compos
+    return nesting_compos
+
+
+def get_uied_gui_components_crops(input_imgs_path, image_names, img_index):
+    '''
+    Analyzes an image and extracts its UI components with an alternative algorithm type
+
+    :param param_img_root: Path to the image
+    :type param_img_root: str
+    :param image_names: Names of the images in the path
+    :type image_names: list
+    :param img_index: Index of the image we want to analyze in images_names
+    :type img_index: int
+    :return: List of image crops and Dict object with components detected
+    :rtype: Tuple
+    '''
+    resize_by_height = 800
+    input_img_path = pjoin(input_imgs_path, image_names[img_index])
+
+    '''
+    ele:min-grad: gradient threshold to produce binary map         
+    ele:ffl-block: fill-flood threshold
+    ele:min-ele-area: minimum area for selected elements 
+    ele:merge-contained-ele: if True, merge elements contained in others
+    text:max-word-inline-gap: words with smaller distance than the gap are counted as a line
+    text:max-line-gap: lines with smaller distance than the gap are counted as a paragraph
+
+    Tips:
+    1. Larger *min-grad* produces fine-grained binary-map while prone to over-segment element to small pieces
+    2. Smaller *min-ele-area* leaves tiny elements while prone to produce noises
+    3. If not *merge-contained-ele*, the elements inside others will be recognized, while prone to produce noises
+    4. The *max-word-inline-gap* and *max-line-gap* should be dependent on the input image size and resolution
+    '''
+    uied_params = {
+        'min-grad': 3,
+        'ffl-block': 5,
+        'min-ele-area': 25,
+        'merge-contained-ele': True,
+        'max-word-inline-gap': 4,
+        'max-line-gap': 4
+    }
+
+    # ##########################
+    # COMPONENT DETECTION
+    # ##########################
+
+    # *** Step 1 *** pre-processing: read img -> get binary map
+    org, grey = utils.read_img(input_img_path, resize_by_height)
+    binary = utils.binarization(org, grad_min=int(uied_params['min-grad']))
+
+    # *** Step 2 *** element detection
+    utils.rm_line(binary, show=False, wait_key=0)
+    uicompos = utils.component_detection(
+        binary, min_obj_area=int(uied_params['min-ele-area']))
+
+    # *** Step 3 *** results refinement
+    uicompos = utils.compo_filter(uicompos, min_area=int(
+        uied_params['min-ele-area']), img_shape=binary.shape)
+    uicompos = utils.merge_intersected_compos(uicompos)
+    utils.compo_block_recognition(binary, uicompos)
+    if uied_params['merge-contained-ele']:
+        uicompos = utils.rm_contained_compos_not_in_block(uicompos)
+    utils.compos_update(uicompos, org.shape)
+    utils.compos_containment(uicompos)
+
+    # *** Step 4 ** nesting inspection: check if big compos have nesting element
+    uicompos += nesting_inspection(org, grey,
+                                   uicompos, ffl_block=uied_params['ffl-block'])
+    utils.compos_update(uicompos, org.shape)
+
+    # ##########################
+    # RESULTS
+    # ##########################
+
+    # *** Step 5 *** save detection result
+    utils.compos_update(uicompos, org.shape)
+
+    clips = [compo.compo_clipping(org) for compo in uicompos]
+
+    return clips, uicompos
+
+
+def get_gui_components_crops(param_img_root, image_names, texto_detectado_ocr, path_to_save_bordered_images, add_words_columns, img_index):
+    '''
+    Analyzes an image and extracts its UI components
+
+    :param param_img_root: Path to the image
+    :type param_img_root: str
+    :param image_names: Names of the images in the path
+    :type image_names: list
+    :param texto_detectado_ocr: Text detected by OCR in previous step
+    :type texto_detectado_ocr: list
+    :param path_to_save_bordered_images: Path to save the image along with the components detected
+    :type path_to_save_bordered_images: str
+    :param add_words_columns: Save words detected by OCR
+    :type add_words_columns: bool
+    :param img_index: Index of the image we want to analyze in images_names
+    :type img_index: int
+    :return: Crops and text inside components
+    :rtype: Tuple
+    '''
+    words = {}
+    words_columns_names = {}
+
+    image_path = param_img_root + image_names[img_index]
+    # Read the image
+    img = cv2.imread(image_path)
+    img_copy = img.copy()
+    # cv2_imshow(img_copy)
+
+    # Store on text_corners the corners of all text boxes
+    # Each row is a different text box, much more friendly than the format returned by keras_ocr 
+    text_boxes = texto_detectado_ocr[img_index]
+    text_corners = np.array([box[1] for box in text_boxes], dtype=np.float32).reshape(-1, 4, 2)
+    words[img_index] = {}
+
+    if add_words_columns:
+        for j in range(0, len(text_boxes)):
+            word = text_boxes[j][0]
+            centroid = (np.mean(text_corners[j, :, 0]), np.mean(text_corners[j, :, 1]))
+            if word in words[img_index]:
+                words[img_index][word] += [centroid]
+            else:
+                words[img_index][word] = [centroid]
+
+            if word in words_columns_names:
+                words_columns_names[word] += 1
+            else:
+                words_columns_names[word] = 1
+
+    # print("Number of text boxes detected (iteration " + str(img_index) + "): " + str(len(texto_detectado_ocr[img_index])))
+
+    # Spatial index over the words centroids to find the words inside each component
+    words_index = WordsIndex(words[img_index])
+
+    # Interval calculation of the text boxes
+    text_x_min = text_corners[:, :, 0].min(axis=1).astype(int)
+    text_x_max = text_corners[:, :, 0].max(axis=1).astype(int)
+    text_y_min = text_corners[:, :, 1].min(axis=1).astype(int)
+    text_y_max = text_corners[:, :, 1].max(axis=1).astype(int)
+
+    # Conversion to grey Scale
+    gris = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    # cv2_imshow(gris)
+
+    # Gaussian blur
+    gauss = cv2.GaussianBlur(gris, (5, 5), 0)
+    # cv2_imshow(gauss)
+
+    # Border detection with Canny
+    canny = cv2.Canny(gauss, 50, 150)
+    # cv2_imshow(canny)
+
+    # Countour search in the image
+    (contornos, _) = cv2.findContours(canny.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    # print("Number of GUI components detected: ", len(contornos), "\n")
+
+    # draw the countours on the image
+    cv2.drawContours(img_copy, contornos, -1, (0, 0, 255), 2)
+    # cv2_imshow(img_copy)
+    cv2.imwrite(path_to_save_bordered_images + image_names[img_index] + '_bordered.png', img_copy)
+
+    # Obtain x and y max and min values of each countour
+    contours_bbox = np.array([cv2.boundingRect(contorno) for contorno in contornos], dtype=int).reshape(-1, 4)
+    contours_x_min = contours_bbox[:, 0]
+    contours_y_min = contours_bbox[:, 1]
+    contours_x_max = contours_bbox[:, 0] + contours_bbox[:, 2] - 1
+    contours_y_max = contours_bbox[:, 1] + contours_bbox[:, 3] - 1
+
+    def overlaps_padded_text_boxes(x, w, y, h):
+        """
+        Check, for each of the boxes (rows), which text boxes padded with the cropping threshold (columns) contain
+        one of its horizontal borders and one of its vertical borders
+        """
+        x, w, y, h = x[:, None], w[:, None], y[:, None], h[:, None]
+        y_min = text_y_min - cropping_threshold
+        y_max = text_y_max + cropping_threshold
+        x_min = text_x_min - cropping_threshold
+        x_max = text_x_max + cropping_threshold
+        # and max([y-y_min, y_max-y, h-y_min, y_max-h])<=surrounding_max_diff
+        solapa_y = ((y_min <= y) & (y <= y_max)) | ((y_min <= h) & (h <= y_max))
+        # and max([x-x_min, x_max-x, w-x_min, x_max-w])<=surrounding_max_diff
+        solapa_x = ((x_min <= x) & (x <= x_max)) | ((x_min <= w) & (w <= x_max))
+        return solapa_y & solapa_x
+
+    # Overlapping between countours and text boxes, and between text boxes themselves
+    contour_text_overlap = overlaps_padded_text_boxes(contours_x_min, contours_x_max, contours_y_min, contours_y_max)
+    text_text_overlap = overlaps_padded_text_boxes(text_x_min, text_x_max, text_y_min, text_y_max)
+
+    # We carry out the crops for each detected countour
+    recortes = []
+    lista_para_no_recortar_dos_veces_mismo_gui = set()
+
+    text_or_not_text = []
+
+    comp_json = {"img_shape": [img.shape], "compos": []}
+
+    for j in range(0, len(contornos)):
+        x = contours_x_min[j]
+        w = contours_x_max[j]
+        y = contours_y_min[j]
+        h = contours_y_max[j]
+        #print('Coord x, componente' + str(j+1) + '  ' + str(x) + ' : ' + str(w))
+        #print('Coord y, componente' + str(j+1) + '  ' + str(y) + ' : ' + str(h))
+
+        # Check that the countours are not overlapping with text boxes. If so, cut the text boxes
+        # Text boxes are checked in order: once the component overlaps with a text box, it is replaced by that text box,
+        # and the following text boxes are checked against it
+        condicion_recorte = True
+        no_solapa = 1
+        overlapping = contour_text_overlap[j]
+        start = 0
+        while overlapping.any():
+            k = start + int(np.argmax(overlapping))
+            if k not in lista_para_no_recortar_dos_veces_mismo_gui:
+                lista_para_no_recortar_dos_veces_mismo_gui.add(k)
+            else:
+                # print("Text inside GUI component " + str(k) + " twice")
+                condicion_recorte = False
+            x = text_x_min[k]
+            w = text_x_max[k]
+            y = text_y_min[k]
+            h = text_y_max[k]
+            no_solapa *= 0
+            start = k + 1
+            overlapping = text_text_overlap[k, start:]
+            #crop_img = img[min(intervalo_y[k]) : max(intervalo_y[k]), min(intervalo_x[k]) : max(intervalo_x[k])]
+            #print("Componente " + str(j+1) + " solapa con cuadro de texto")
+        # If the GUI component overlaps with the textbox, cut the later one
+        # gaze_point_x and gaze_point_x >= x and gaze_point_x <= w and gaze_point_y >= y and gaze_point_y <= h and duration >= gaze_analysis_threshold
+        coincidence_with_attention_point = True
+        if (condicion_recorte and coincidence_with_attention_point):
+            crop_img = img[y:h, x:w]
+            text = words_index.words_inside(x, y, w, h)
+            is_text = True if len(text)>0 else False
+            comp_json["compos"].append({
+                "id": int(j+1),
+                "class": "Text" if is_text else "Compo",
+                "Text": text[0] if is_text else None,
+                "column_min": int(x),
+                "row_min": int(y),
+                "column_max": int(w),
+                "row_max": int(h),
+                "width": int(w - x),
+                "height": int(h - y)
+            })
+            recortes.append(crop_img)
+            text_or_not_text.append(abs(no_solapa-1))
+
+    return (recortes, comp_json, text_or_not_text, words)
+
+def detect_image_components(param_img_root, image_name, text_boxes, path_to_save_bordered_images, add_words_columns, algorithm, lazy_crops,
+                            crop_store, component_store):
+    """
+    Detects the GUI components of one screencapture and stores its outputs (components and crops). It is executed
+    by the detection workers, so the crops never leave the process that obtains them
+
+    :param param_img_root: Path where the imaages associated to each log row are stored
+    :type param_img_root: str
+    :param image_name: Name of the screencapture
+    :type image_name: str
+    :param text_boxes: Words identified by OCR in the screencapture
+    :type text_boxes: list
+    :param lazy_crops: Do not store the crops, they are cropped again from the screencapture when needed
+    :type lazy_crops: bool
+    :param crop_store: Crop store of the family, opened once by the caller
+    :type crop_store: CropStore
+    :param component_store: Component store of the family, opened once by the caller
+    :type component_store: ComponentStore
+    :returns: Name of the screencapture and number of components detected
+    :rtype: tuple
+    """
+    path_to_save_gui_components_npy = param_img_root+"components_npy/"
+
+    screenshot_texts_npy = path_to_save_gui_components_npy + image_name + "_texts.npy"
+
+    # Gaze analysis?
+
+    if algorithm == "rpa-us":
+        recortes, comp_json, text_or_not_text, words = get_gui_components_crops(param_img_root, [image_name], [text_boxes], path_to_save_bordered_images, add_words_columns, 0)
+
+        # save metadata
+        component_store.put(image_name, comp_json)
+
+        # save ui elements crops
+        if not lazy_crops:
+            crop_store.put(image_name, recortes)
+
+        # save texts npy
+        np.save(screenshot_texts_npy, text_or_not_text)
+
+    elif algorithm == "uied":
+        # this method edit the metadata json with the ui element class and text if corresponds
+        recortes, uicompos = get_uied_gui_components_crops(param_img_root, [image_name], 0)
+
+        # store all bounding boxes from the ui elements that are in 'uicompos'
+        component_store.put(image_name, utils.corners_json(uicompos))
+
+        # save ui elements crops
+        if not lazy_crops:
+            crop_store.put(image_name, recortes)
+
+    else:
+        recortes = []
+
+    # if (add_words_columns and (not no_modification)) or (add_words_columns and (not os.path.exists(param_img_root+"text_colums.csv"))):
+    #     storage_text_info_as_dataset(words, image_names, log, param_img_root)
+
+    return image_name, len(recortes)
+
+
+# Stores of the family opened by a detection worker process, shared by all the screencaptures it detects. Their
+# connection is released when the worker exits, along with the pool
+worker_stores = None
+
+
+def init_detection_worker(param_img_root):
+    global worker_stores
+    worker_stores = (CropStore(param_img_root+"components_npy/"), ComponentStore(param_img_root+"components_json/"))
+
+
+def detect_image_components_in_worker(*task):
+    return detect_image_components(*task, *worker_stores)
+
+
+@contextmanager
+def detection_pool(detection_workers, param_img_root):
+    """
+    Pool of processes of the detection workers. Processes of a daemonic pool (as the Celery prefork workers) are not
+    allowed to have multiprocessing children, so billiard (the multiprocessing fork used by Celery) is used inside them
+
+    :param detection_workers: Number of processes
+    :type detection_workers: int
+    :param param_img_root: Path of the family, which stores are opened by each process when it starts
+    :type param_img_root: str
+    :returns: Function which submits a call to the pool, and returns a function that waits for its result
+    :rtype: function
+    """
+    if multiprocessing.current_process().daemon:
+        with billiard.Pool(detection_workers, init_detection_worker, (param_img_root,)) as pool:
+            yield lambda function, *args: pool.apply_async(function, args).get
+    else:
+        with ProcessPoolExecutor(max_workers=detection_workers, initializer=init_detection_worker, initargs=(param_img_root,)) as executor:
+            yield lambda function, *args: executor.submit(function, *args).result
+
+
+def detect_images_components(param_img_root, log, special_colnames, skip, image_names, text_detected_by_OCR, path_to_save_bordered_images, add_words_columns, algorithm, detection_workers=1, max_in_flight=0, lazy_crops=False):
+    """
+    With this function we process the screencaptures using the information resulting by aplying OCR
+    and the image itself. We crop the GUI components and store them in a numpy array with all the 
+    cropped components for each of the images in images_names
+
+
+    :param param_img_root: Path where the imaages associated to each log row are stored
+    :type param_img_root: str
+    :image_names: Names of images in the log by alphabetical order
+    :type image_names: list
+    :texto_detectado_ocr: List of lists corresponding the words identified in the images on the log file
+    :type texto_detectado_ocr: list
+    :path_to_save_bordered_images: Path where the images along with their component borders must be stored
+    :type path_to_save_bordered_images: str
+    :param detection_workers: Number of processes detecting screencaptures at the same time (1: in this process)
+    :type detection_workers: int
+    :param max_in_flight: Maximum number of screencaptures submitted to the workers and not collected yet (0: twice the workers)
+    :type max_in_flight: int
+    :param lazy_crops: Only store the boxes of the components (in the component store), not their crops
+    :type lazy_crops: bool
+    :returns: Name of each screencapture and number of components detected (None if its outputs were kept), in the log order
+    :rtype: list
+    """
+    crop_store = CropStore(param_img_root+"components_npy/")
+    if not skip:
+        crop_store.clear()
+
+    component_store = ComponentStore(param_img_root+"components_json/")
+    try:
+        # Screenshots which outputs are kept
+        kept = [skip and image_name in component_store and (lazy_crops or image_name in crop_store)
+                for image_name in image_names]
+        tasks = ((param_img_root, image_names[img_index], text_detected_by_OCR[img_index], path_to_save_bordered_images, add_words_columns, algorithm, lazy_crops)
+                 for img_index in range(0, len(image_names)) if not kept[img_index])
+        progress = tqdm(total=len(image_names) - sum(kept), desc=f"Getting crops for {param_img_root}")
+        detected = []
+
+        if detection_workers <= 1:
+            for task in tasks:
+                detected.append(detect_image_components(*task, crop_store, component_store))
+                progress.update()
+        else:
+            # the workers open their own connections to the store
+            component_store.close()
+            # The screencaptures are collected in submission order, and no more than max_in_flight are pending at the
+            # same time, so neither the OCR info of the whole log is sent at once nor the results pile up in the parent
+            max_in_flight = max_in_flight if max_in_flight > 0 else 2 * detection_workers
+            in_flight = deque()
+            with detection_pool(detection_workers, param_img_root) as submit:
+                for task in tasks:
+                    if len(in_flight) >= max_in_flight:
+                        detected.append(in_flight.popleft()())
+                        progress.update()
+                    in_flight.append(submit(detect_image_components_in_worker, *task))
+                while in_flight:
+                    detected.append(in_flight.popleft()())
+                    progress.update()
+        progress.close()
+    finally:
+        component_store.close()
+    detected = iter(detected)
+    return [(image_name, None) if is_kept else next(detected) for image_name, is_kept in zip(image_names, kept)]
+
+
+# def storage_text_info_as_dataset(words, image_names, log, param_img_root):
+#     headers = []
+#     for w in words[1]:
+#         if words[1][w] == 1:
+#             headers.append(w)
+#         else:
+#             [headers.append(w+"_"+str(i)) for i in range(1, words[1][w]+1)]
+#     initial_row = ["NaN"]*len(headers)
+
+#     df = pd.DataFrame([], columns=headers)
+#     words = words[0]
+
+#     for j in range(0, len(image_names)):
+#         for w in words[j]:
+#             centroid_ls = list(words[j][w])
+#             if len(centroid_ls) == 1:
+#                 if w in headers:
+#                     pos = headers.index(w)
+#                 else:
+#                     pos = headers.index(w+"_1")
+#                     initial_row[pos] = centroid_ls[0]
+#             else:
+#                 ac = 0
+#                 for index, h in enumerate(headers):
+#                     if len(centroid_ls) > ac and (str(w) in h):
+#                         initial_row[index] = centroid_ls[ac]
+#                         ac += 1
+#         df.loc[j] = initial_row
+
+#     log_enriched = log.join(df).fillna(method='ffill')
+#     log_enriched.to_csv(param_img_root+"text_colums.csv")
+
+
+"""
+GUI component detection
+
+The objective of this section is to be able to detect, define and crop each
+of the graphic components (Symbols, images or text boxes) that form constitute
+a screenshot
+
+Libraries Import: We will use mainly keras_ocr and Opencv (Cv2).
+=====================================
+Border detection and cropping: OpenCV
+
+We make use of OpenCV to carry out the following tasks:
+- Image read.
+- Calculation of intervals occupied by the text boxes obtained from keras_ocr
+- Image processing:
+    > GreyScale conversion
+    > Gaussian blur
+    > **Canny algorithm** for border detection
+    > Countour detection
+- Comparison betweeen countour and text boxes, giving more importance to text boxes 
+    in case there is overlapping
+- Final crop of each of the components
+
+"""
+
+
+def ui_elements_detection(param_log_path, param_img_root, special_colnames, add_words_columns=False, skip=False, algorithm="legacy", ocr_batch_size=8, ocr_bucket_by_size=True, detection_workers=1, max_in_flight=0, lazy_crops=False):
+    tprint(platform_name + " - " + detection_phase_name, "fancy60")
+    print(param_img_root+"\n")
+    
+    # Log read
+    log = pd.read_csv(param_log_path, sep=",")
+    # Extract the names of the screenshots associated to each of the rows in the log
+    image_names = log.loc[:, special_colnames["Screenshot"]].values.tolist()
+    # OCR results are looked up by screenshot content, so screenshots shared with other families are only recognized once
+    ocr_store = OCRStore(ocr_cache_location)
+    digests = [file_sha256(param_img_root + img) for img in image_names]
+    text_corners = [ocr_store.get(digest) for digest in digests]
+
+    # First image of the log with each of the contents that have not been recognized yet
+    pending = {}
+    for img_index, digest in enumerate(digests):
+        if text_corners[img_index] is None and digest not in pending:
+            pending[digest] = img_index
+
+    if pending:
+        # The OCR models are loaded once per process and shared by all families
+        pipeline = model_registry.get_ocr_pipeline()
+        ocr_results = get_ocr_images_batched(pipeline, param_img_root, [image_names[i] for i in pending.values()], ocr_batch_size, ocr_bucket_by_size)
+        for digest, ocr_result in zip(pending.keys(), ocr_results):
+            ocr_store.put(digest, ocr_result)
+        recognized = dict(zip(pending.keys(), ocr_results))
+        text_corners = [recognized[digest] if corners is None else corners for digest, corners in zip(digests, text_corners)]
+    else:
+        print("\n\nReading images OCR info from cache...")
+
+    # print(len(text_corners))
+
+    bordered = param_img_root+"contours/"
+    components_npy = param_img_root+"components_npy/"
+    components_json = param_img_root+"components_json/"
+    for p in [bordered, components_npy, components_json]:
+        if not os.path.exists(p):
+            os.mkdir(p)
+
+    # The words are kept for the plaintext feature extraction
+    component_store = ComponentStore(components_json)
+    try:
+        component_store.set_words((image_name, [word for word, _ in corners]) for image_name, corners in zip(image_names, text_corners))
+    finally:
+        component_store.close()
+
+    detect_images_components(param_img_root, log, special_colnames, skip, image_names, text_corners, bordered, add_words_columns, algorithm, detection_workers, max_in_flight, lazy_crops)
+    # Table with the components of all the screenshots, for the analysis of the results
+    export_components_parquet(components_json)
+
+
+
+############################################
+############# Development utils ############
+############################################
+
+def check_npy_components_of_capture(image_name="1.png.npy", image_path="media/screenshots/components_npy/", interactive=False):
+    if interactive:
+        image_path = input("Enter path to images numpy arrays location: ")
+        image_name = input("Enter numpy array file name: ")
+    recortes = CropStore(image_path).get(image_name[:-len(".npy")] if image_name.endswith(".npy") else image_name)
+    for i in range(0, len(recortes)):
+        print("Length: " + str(len(recortes)))
+        if recortes[i].any():
+            print("\nComponent: ", i+1)
+            plt.imshow(recortes[i], interpolation='nearest')
+            plt.show()
+        else:
+            print("Empty component")
+    if interactive:
+        image_path = input(
+            "Do you want to check another image components? Indicate another npy file name: ")
         check_npy_components_of_capture(image_path, None, True)
\ No newline at end of file
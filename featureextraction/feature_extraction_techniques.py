@@ -1,78 +1,339 @@
-
-import numpy as np
-import pandas as pd
-from tqdm import tqdm
-import json
-
-def quantity_ui_elements_fe_technique(
-    ui_elements_classification_classes, 
-    screenshot_colname, metadata_json_root, ui_log_path,
-    enriched_log_output_path):
-    """
-    Since not all images have all classes, a dataset with different columns depending on the images will be generated.
-    It will depend whether GUI components of every kind appears o only a subset of these. That is why we initiañize a 
-    dataframe will all possible columns, and include row by row the results obtained from the predictions
-
-    :param feature_extraction_technique_name: Feature extraction technique name
-    :type feature_extraction_technique_name: str
-    :param enriched_log_output_path: Path to save the enriched log
-    :type enriched_log_output_path: str
-    :param skip: Rewrite log
-    :type skip: bool
-
-    """
-    log = pd.read_csv(ui_log_path, sep=",")
-    screenshot_filenames = log.loc[:, screenshot_colname].values.tolist()
-
-    quantity_ui_elements = {}
-
-    for screenshot_filename in screenshot_filenames:
-        print("holaa")
-        # This network gives as output the name of the detected class. Additionally, we moddify the json file with the components to add the corresponding classes
-        with open(metadata_json_root + screenshot_filename + '.json', 'r') as f:
-            data = json.load(f)
-
-        for c in ui_elements_classification_classes:
-            counter = 0
-            for j in range(0, len(data["compos"])):
-                if data["compos"][j]["class"] == c:
-                    counter+=1
-            quantity_ui_elements[c] = counter
-
-        data["features"] = { "quantity": quantity_ui_elements }
-        with open(metadata_json_root + screenshot_filename + '.json', "w") as jsonFile:
-            json.dump(data, jsonFile)
-
-    df = pd.DataFrame([], columns=ui_elements_classification_classes)
-    for i in range(0, len(screenshot_filenames)):
-        df.loc[i] = quantity_ui_elements.values()
-
-    """
-    Once the dataset corresponding to the ammount of elements of each class contained in each of the images is obtained,
-    we merge it with the complete log, adding the extracted characteristics from the images
-    """
-
-    log_enriched = log.join(df).fillna(method='ffill')
-
-    """
-    Finally we obtain an entiched log, which is turned as proof of concept of our hypothesis based on the premise that if
-    we not only capture keyboard or mouse events on the monitorization through a keylogger, but also screencaptures,
-    we can extract much more useful information, being able to improve the process mining over said log.
-    As a pending task, we need to validate this hypothesis through a results comparison against the non-enriched log.
-    We expect to continue this project in later stages of the master
-    """
-    log_enriched.to_csv(enriched_log_output_path)
-    print("\n\n=========== ENRICHED LOG GENERATED: path=" + enriched_log_output_path)
-
-
-
-def location_ui_elements_fe_technique(
-    ui_elements_classification_classes, 
-    screenshot_colname, metadata_json_root, ui_log_path,
-    enriched_log_output_path):
-    print("TODO") # TODO: 
-
-def location_ui_elements_and_plaintext_fe_technique(feature_extraction_technique_name, skip):
-    print("TODO") # TODO: 
-
-
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+import json
+import os
+import zlib
+from scipy import sparse
+from django.core.exceptions import ValidationError
+from featureextraction.component_store import ComponentStore
+from featureextraction.ocr_cache import OCRStore
+from rim.utils import file_sha256
+from rim.settings import ocr_cache_location
+
+default_location_grid = [4, 4]
+default_location_mode = "count"
+default_plaintext_vocabulary_size = 1000
+# Suffix of the file with the sparse features of the enriched log, written next to it
+sparse_features_suffix = "_features.npz"
+
+
+def factorize_log_screenshots(log, screenshot_colname):
+    """
+    :returns: Position of the screenshot of each row of the log among the distinct screenshots, and the distinct screenshots
+    :rtype: tuple
+    """
+    log_screenshots, screenshots = pd.factorize(log.loc[:, screenshot_colname])
+    # pd.factorize codes the missing values as -1, which would take the features of the last screenshot
+    missing = log.index[log_screenshots < 0]
+    if len(missing) > 0:
+        raise ValidationError("Rows of the UI log without screenshot: " + ", ".join(str(row) for row in missing[:10]) +
+                              (" ..." if len(missing) > 10 else ""))
+    return log_screenshots, screenshots
+
+
+def quantity_ui_elements_fe_technique(
+    ui_elements_classification_classes, 
+    screenshot_colname, metadata_json_root, ui_log_path,
+    enriched_log_output_path, configurations=None):
+    """
+    Since not all images have all classes, a dataset with different columns depending on the images will be generated.
+    It will depend whether GUI components of every kind appears o only a subset of these. That is why we initiañize a 
+    dataframe will all possible columns, and include row by row the results obtained from the predictions
+
+    :param feature_extraction_technique_name: Feature extraction technique name
+    :type feature_extraction_technique_name: str
+    :param enriched_log_output_path: Path to save the enriched log
+    :type enriched_log_output_path: str
+    :param configurations: Not used by this technique
+    :type configurations: dict
+    :param skip: Rewrite log
+    :type skip: bool
+
+    """
+    log = pd.read_csv(ui_log_path, sep=",")
+    log_screenshots, screenshots = factorize_log_screenshots(log, screenshot_colname)
+    screenshot_filenames = log.loc[:, screenshot_colname].values.tolist()
+
+    # The components of each class in each screenshot are counted by the component store, and arranged in a
+    # screenshot x class matrix, with one row per distinct screenshot of the log
+    component_store = ComponentStore(metadata_json_root)
+    class_counts = component_store.class_counts(screenshot_filenames)
+    screenshot_codes = screenshots.get_indexer(class_counts["screenshot"])
+    class_codes = pd.Index(ui_elements_classification_classes).get_indexer(class_counts["class"])
+    known = (screenshot_codes >= 0) & (class_codes >= 0)
+    quantity_ui_elements = np.bincount(screenshot_codes[known] * len(ui_elements_classification_classes) + class_codes[known],
+                                       weights=class_counts["count"].values[known],
+                                       minlength=len(screenshots) * len(ui_elements_classification_classes)).astype(np.int64)
+    quantity_ui_elements = quantity_ui_elements.reshape(len(screenshots), len(ui_elements_classification_classes))
+
+    component_store.set_features((screenshot_filename, {"quantity": dict(zip(ui_elements_classification_classes, quantity))})
+                                 for screenshot_filename, quantity in zip(screenshots, quantity_ui_elements.tolist()))
+
+    df = pd.DataFrame(quantity_ui_elements[log_screenshots], columns=ui_elements_classification_classes, index=log.index)
+
+    """
+    Once the dataset corresponding to the ammount of elements of each class contained in each of the images is obtained,
+    we merge it with the complete log, adding the extracted characteristics from the images
+    """
+
+    log_enriched = log.join(df).fillna(method='ffill')
+
+    """
+    Finally we obtain an entiched log, which is turned as proof of concept of our hypothesis based on the premise that if
+    we not only capture keyboard or mouse events on the monitorization through a keylogger, but also screencaptures,
+    we can extract much more useful information, being able to improve the process mining over said log.
+    As a pending task, we need to validate this hypothesis through a results comparison against the non-enriched log.
+    We expect to continue this project in later stages of the master
+    """
+    log_enriched.to_csv(enriched_log_output_path)
+    print("\n\n=========== ENRICHED LOG GENERATED: path=" + enriched_log_output_path)
+
+
+
+def sparse_features_path(enriched_log_output_path):
+    return os.path.splitext(enriched_log_output_path)[0] + sparse_features_suffix
+
+
+def save_log_with_sparse_features(log, features, log_rows, columns, enriched_log_output_path, chunk_cells=10000000):
+    """
+    Saves the log enriched with a sparse matrix of features. The enriched log is a dense CSV, since the phases that
+    read it (flattening and decision model discovery) work over dense tables: only the rows of one chunk of the log
+    are densified at a time to be written. The features are also saved without densifying them, with one row per row
+    of the log, next to the enriched log (see 'read_sparse_features')
+
+    :param log: Log to enrich
+    :type log: DataFrame
+    :param features: Matrix with one row per distinct screenshot of the log
+    :type features: scipy.sparse.csr_matrix
+    :param log_rows: Row of the matrix corresponding to each row of the log (see 'factorize_log_screenshots')
+    :type log_rows: numpy.ndarray
+    :param columns: Names of the features
+    :type columns: list
+    :param enriched_log_output_path: Path to save the enriched log
+    :type enriched_log_output_path: str
+    :param chunk_cells: Maximum number of features densified at a time
+    :type chunk_cells: int
+    """
+    if (log_rows < 0).any():
+        # a negative row would be taken from the end of the matrix
+        raise ValidationError("Rows of the UI log without features: " + ", ".join(str(row) for row in log.index[log_rows < 0][:10]))
+    chunk_size = max(1, chunk_cells // max(len(columns), 1))
+    with open(enriched_log_output_path, "w", newline="") as f:
+        for start in range(0, max(len(log), 1), chunk_size):
+            chunk = log.iloc[start:start + chunk_size]
+            chunk_features = pd.DataFrame(features[log_rows[start:start + chunk_size]].toarray(), index=chunk.index, columns=columns)
+            chunk.join(chunk_features).to_csv(f, header=start == 0)
+    # same layout as scipy.sparse.save_npz, so the file can also be read with scipy.sparse.load_npz
+    log_features = features[log_rows].tocsr()
+    np.savez_compressed(sparse_features_path(enriched_log_output_path), format=np.array("csr"), shape=np.array(log_features.shape),
+                        data=log_features.data, indices=log_features.indices, indptr=log_features.indptr, columns=np.array(columns, dtype=str))
+
+
+def read_sparse_features(enriched_log_output_path):
+    """
+    :param enriched_log_output_path: Path of the enriched log saved by a sparse technique
+    :type enriched_log_output_path: str
+    :returns: Sparse matrix with the features of each row of the log, and the names of its columns
+    :rtype: tuple
+    """
+    with np.load(sparse_features_path(enriched_log_output_path)) as f:
+        features = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+        return features, f["columns"].tolist()
+
+
+def screenshots_sparse_features(screenshots, features, feature_names):
+    """
+    :returns: Pairs of (screenshot name, dict with its non zero features), to be stored in the component store
+    :rtype: generator
+    """
+    features = features.tocsr()
+    for screenshot_filename, start, end in zip(screenshots, features.indptr[:-1], features.indptr[1:]):
+        yield screenshot_filename, {feature_names[i]: int(v) for i, v in zip(features.indices[start:end], features.data[start:end])}
+
+
+def location_features(ui_elements_classification_classes, screenshots, component_store, configurations):
+    """
+    Rasterizes the classified GUI components of each screenshot onto a coarse grid, obtaining one feature per class and
+    cell of the grid. The features of all the components are calculated at once
+
+    :param screenshots: Distinct screenshots of the log
+    :type screenshots: pandas.Index
+    :returns: Sparse matrix with one row per screenshot, and the names of its columns
+    :rtype: tuple
+    """
+    grid_rows, grid_columns = configurations.get("grid", default_location_grid)
+    mode = configurations.get("mode", default_location_mode)
+    cells = grid_rows * grid_columns
+
+    compos = component_store.components_frame(screenshots, ["screenshot", "class", "column_min", "row_min", "column_max", "row_max"])
+    images_sizes = component_store.images_sizes(screenshots)
+
+    screenshot_codes = screenshots.get_indexer(compos["screenshot"])
+    class_codes = pd.Index(ui_elements_classification_classes).get_indexer(compos["class"])
+    known = (screenshot_codes >= 0) & (class_codes >= 0)
+    screenshot_codes, class_codes = screenshot_codes[known], class_codes[known]
+    column_min, row_min, column_max, row_max = (compos[c].values[known] for c in ["column_min", "row_min", "column_max", "row_max"])
+    height, width = images_sizes[screenshot_codes, 0], images_sizes[screenshot_codes, 1]
+
+    def grid_cell(position, size, divisions):
+        return np.clip(position * divisions // np.maximum(size, 1), 0, divisions - 1)
+
+    if mode == "occupancy":
+        # cells covered by the box of each component (the maximum row and column are not part of the box)
+        first_row, last_row = grid_cell(row_min, height, grid_rows), grid_cell(np.maximum(row_max - 1, row_min), height, grid_rows)
+        first_column, last_column = grid_cell(column_min, width, grid_columns), grid_cell(np.maximum(column_max - 1, column_min), width, grid_columns)
+        box_rows, box_columns = last_row - first_row + 1, last_column - first_column + 1
+        box_cells = box_rows * box_columns
+        # one entry per component and covered cell
+        compo = np.repeat(np.arange(len(box_cells)), box_cells)
+        offset = np.arange(box_cells.sum()) - np.repeat(np.cumsum(box_cells) - box_cells, box_cells)
+        rows = first_row[compo] + offset // box_columns[compo]
+        columns = first_column[compo] + offset % box_columns[compo]
+        screenshot_codes, class_codes = screenshot_codes[compo], class_codes[compo]
+    else:
+        rows = grid_cell((row_min + row_max) // 2, height, grid_rows)
+        columns = grid_cell((column_min + column_max) // 2, width, grid_columns)
+
+    # duplicated entries (components of the same class in the same cell) are summed
+    features = sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (screenshot_codes, class_codes * cells + rows * grid_columns + columns)),
+                                 shape=(len(screenshots), len(ui_elements_classification_classes) * cells))
+    if mode == "occupancy":
+        features.data[:] = 1
+    feature_names = [c + "_" + str(row) + "_" + str(column) for c in ui_elements_classification_classes for row in range(grid_rows) for column in range(grid_columns)]
+    return features, feature_names
+
+
+def plaintext_features(screenshots, component_store, configurations):
+    """
+    Encodes the words recognized by OCR in each screenshot with a vocabulary shared by all the screenshots of the log,
+    obtaining the number of times each word appears in each screenshot. With "hashing_features", the words are hashed
+    into that number of features instead, so the columns do not depend on the words of the log
+
+    :param screenshots: Distinct screenshots of the log
+    :type screenshots: pandas.Index
+    :returns: Sparse matrix with one row per screenshot, and the names of its columns
+    :rtype: tuple
+    """
+    vocabulary_size = configurations.get("vocabulary_size", default_plaintext_vocabulary_size)
+    hashing_features = configurations.get("hashing_features", 0)
+
+    stored_words = component_store.words()
+    missing = [screenshot_filename for screenshot_filename in screenshots if screenshot_filename not in stored_words]
+    if missing:
+        # families detected by previous versions: the words are in the OCR cache, looked up by the screenshot content
+        ocr_store = OCRStore(ocr_cache_location)
+        screenshots_root = os.path.dirname(os.path.normpath(component_store.root)) + os.sep
+        recovered = []
+        for screenshot_filename in missing:
+            corners = ocr_store.get(file_sha256(screenshots_root + screenshot_filename))
+            recovered.append((screenshot_filename, [word for word, _ in corners] if corners is not None else []))
+        component_store.set_words(recovered)
+        stored_words.update(recovered)
+
+    screenshots_words = [stored_words[screenshot_filename] for screenshot_filename in screenshots]
+    words_number = np.array([len(words) for words in screenshots_words], dtype=np.int64)
+    screenshot_codes = np.repeat(np.arange(len(screenshots)), words_number)
+    word_codes, vocabulary = pd.factorize(pd.Series([word for words in screenshots_words for word in words], dtype=object))
+
+    if hashing_features > 0:
+        # stable hash of each word of the vocabulary (python's hash changes between processes)
+        buckets = np.array([zlib.crc32(str(word).encode()) % hashing_features for word in vocabulary], dtype=np.int64)
+        word_codes = buckets[word_codes] if len(word_codes) > 0 else word_codes
+        feature_names = ["text_hash_" + str(i) for i in range(hashing_features)]
+    else:
+        feature_names = ["text_" + str(word) for word in vocabulary]
+
+    # duplicated entries (repeated words in the same screenshot) are summed
+    features = sparse.csr_matrix((np.ones(len(word_codes), dtype=np.int64), (screenshot_codes, word_codes)),
+                                 shape=(len(screenshots), len(feature_names)))
+
+    if hashing_features <= 0 and 0 < vocabulary_size < len(feature_names):
+        # the most frequent words of the log
+        kept = np.sort(np.argsort(-np.asarray(features.sum(axis=0)).ravel(), kind="stable")[:vocabulary_size])
+        features = features[:, kept]
+        feature_names = [feature_names[i] for i in kept]
+    return features, feature_names
+
+
+def sparse_fe_technique(ui_elements_classification_classes, screenshot_colname, metadata_json_root, ui_log_path,
+                        enriched_log_output_path, configurations, techniques):
+    """
+    Enriches the log with the sparse features of the given techniques, and stores them in the component store
+
+    :param techniques: Names of the techniques ("location", "plaintext")
+    :type techniques: list
+    """
+    configurations = configurations or {}
+    log = pd.read_csv(ui_log_path, sep=",")
+    log_screenshots, screenshots = factorize_log_screenshots(log, screenshot_colname)
+    component_store = ComponentStore(metadata_json_root)
+
+    matrices, feature_names, screenshots_features = [], [], {screenshot_filename: {} for screenshot_filename in screenshots}
+    for technique in techniques:
+        if technique == "location":
+            features, names = location_features(ui_elements_classification_classes, screenshots, component_store, configurations)
+        else:
+            features, names = plaintext_features(screenshots, component_store, configurations)
+        for screenshot_filename, technique_features in screenshots_sparse_features(screenshots, features, names):
+            screenshots_features[screenshot_filename][technique] = technique_features
+        matrices.append(features)
+        feature_names.extend(names)
+
+    component_store.set_features(screenshots_features.items())
+
+    save_log_with_sparse_features(log, sparse.hstack(matrices, format="csr"), log_screenshots, feature_names, enriched_log_output_path)
+    print("\n\n=========== ENRICHED LOG GENERATED: path=" + enriched_log_output_path)
+
+
+def location_ui_elements_fe_technique(
+    ui_elements_classification_classes, 
+    screenshot_colname, metadata_json_root, ui_log_path,
+    enriched_log_output_path, configurations=None):
+    """
+    Rasterizes the classified GUI components of each screenshot onto a coarse grid, obtaining one feature per class and
+    cell of the grid. The features are kept in a sparse matrix, since most of the cells of a screenshot have no component
+    of most of the classes
+
+    :param ui_elements_classification_classes: Model classes
+    :type ui_elements_classification_classes: list
+    :param configurations: "grid": [rows, columns] of the grid; "mode": "count" (number of components of the class whose
+                           center is in the cell) or "occupancy" (1 if any component of the class overlaps the cell)
+    :type configurations: dict
+    :param enriched_log_output_path: Path to save the enriched log
+    :type enriched_log_output_path: str
+    """
+    sparse_fe_technique(ui_elements_classification_classes, screenshot_colname, metadata_json_root, ui_log_path,
+                        enriched_log_output_path, configurations, ["location"])
+
+
+def plaintext_fe_technique(
+    ui_elements_classification_classes, 
+    screenshot_colname, metadata_json_root, ui_log_path,
+    enriched_log_output_path, configurations=None):
+    """
+    Enriches the log with the words recognized by OCR in each screenshot, one feature per word of the vocabulary of the
+    whole log (or per hashing bucket). The features are kept in a sparse matrix, since each screenshot only contains a
+    few words of the vocabulary
+
+    :param configurations: "vocabulary_size": number of most frequent words kept (1000 by default, 0: all of them); "hashing_features":
+                           number of features the words are hashed into (0: one feature per word of the vocabulary)
+    :type configurations: dict
+    :param enriched_log_output_path: Path to save the enriched log
+    :type enriched_log_output_path: str
+    """
+    sparse_fe_technique(ui_elements_classification_classes, screenshot_colname, metadata_json_root, ui_log_path,
+                        enriched_log_output_path, configurations, ["plaintext"])
+
+
+def location_ui_elements_and_plaintext_fe_technique(
+    ui_elements_classification_classes, 
+    screenshot_colname, metadata_json_root, ui_log_path,
+    enriched_log_output_path, configurations=None):
+    """
+    Enriches the log with both the location features and the plaintext features (see their techniques for the
+    configurations)
+    """
+    sparse_fe_technique(ui_elements_classification_classes, screenshot_colname, metadata_json_root, ui_log_path,
+                        enriched_log_output_path, configurations, ["location", "plaintext"])
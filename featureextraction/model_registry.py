@@ -0,0 +1,103 @@
+import os
+import threading
+from collections import OrderedDict
+import keras_ocr
+from keras.models import model_from_json
+from featureextraction.CNN.CompDetCNN import CompDetCNN
+from rim.utils import file_sha256
+from rim.settings import classification_models_cache_size
+
+"""
+Process level registry of the models used by the platform
+
+Loading the models weights is expensive, so each model is loaded only once per process (Celery worker) and shared by every
+scenario and family that the process executes. The models are loaded lazily, the first time they are requested, unless
+'warm_up' is called before (at worker start).
+
+The classification models are identified by their paths and the hash of their files, so a model file replaced on disk is
+loaded again. The last 'classification_models_cache_size' models used are kept loaded.
+"""
+
+_lock = threading.Lock()
+_ocr_pipeline = None
+_classification_models = OrderedDict()
+# Hash of the model files, memoized by path, size and modification time
+_files_digests = {}
+
+
+def get_ocr_pipeline():
+    """
+    Returns the keras-ocr pipeline (CRAFT detector and CRNN recognizer) of this process, loading it the first time
+
+    :returns: keras_ocr pipeline
+    :rtype: keras_ocr.pipeline.Pipeline
+    """
+    global _ocr_pipeline
+    if _ocr_pipeline is None:
+        with _lock:
+            if _ocr_pipeline is None:
+                _ocr_pipeline = keras_ocr.pipeline.Pipeline()
+    return _ocr_pipeline
+
+
+def file_digest(path):
+    stat = os.stat(path)
+    memo_key = (path, stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _files_digests:
+        _files_digests[memo_key] = file_sha256(path)
+    return _files_digests[memo_key]
+
+
+def get_classification_model(key, load):
+    """
+    Returns the classification model identified by the key, loading it with 'load' if it is not in the cache. The least
+    recently used model is evicted when the cache is full
+
+    :param key: Identifier of the model, including the hash of its files
+    :type key: tuple
+    :param load: Function without arguments that loads the model
+    :type load: function
+    """
+    with _lock:
+        if key in _classification_models:
+            _classification_models.move_to_end(key)
+            return _classification_models[key]
+        model = load()
+        _classification_models[key] = model
+        while len(_classification_models) > max(classification_models_cache_size, 1):
+            _classification_models.popitem(last=False)
+        return model
+
+
+def get_uied_classifier(model, classes, shape):
+    """
+    :returns: UIED classifier of the model file, with the given classes and input shape
+    :rtype: CompDetCNN
+    """
+    key = ('uied', model, file_digest(model), tuple(classes), tuple(shape))
+    return get_classification_model(key, lambda: CompDetCNN(model, classes, shape))
+
+
+def get_legacy_classifier(model, model_properties):
+    """
+    :param model: Path to the model weights (h5)
+    :type model: str
+    :param model_properties: Path to the model architecture (json)
+    :type model_properties: str
+    :returns: Keras model of the legacy classifier
+    """
+    def load():
+        with open(model_properties, 'r') as json_file:
+            loaded_model = model_from_json(json_file.read())
+        loaded_model.load_weights(model)
+        return loaded_model
+
+    key = ('legacy', model, file_digest(model), model_properties, file_digest(model_properties))
+    return get_classification_model(key, load)
+
+
+def warm_up():
+    """
+    Loads the models of the registry in advance, so the first task executed by the process does not pay the loading cost
+    """
+    get_ocr_pipeline()
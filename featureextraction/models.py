@@ -1,28 +1,36 @@
-from django.db import models
-
-# Create your models here.
-from email.policy import default
-from xmlrpc.client import Boolean
-from django.db import models
-from django.contrib.postgres.fields import ArrayField, JSONField
-from django.db.models import JSONField
-
-class UIElementsDetection(models.Model):
-    add_words_columns = models.BooleanField(default=False)
-    type = models.CharField(max_length=25, default='rpa-us')
-    skip = models.BooleanField(default=False)
-
-class NoiseFiltering(models.Model):
-    type = models.CharField(max_length=25, default='attention-points')
-    configurations = JSONField()
-    # eyetracking_log_filename =  models.CharField(max_length=255, default="eyetracking_log.csv")
-
-class UIElementsClassification(models.Model):
-    model = models.CharField(max_length=255, default="resources/models/custom-v2.h5")
-    model_properties = models.CharField(max_length=255, default="resources/models/custom-v2-classes.json")
-    type = models.CharField(max_length=25, default='rpa-us')
-    skip = models.BooleanField(default=False)
-
-class FeatureExtractionTechnique(models.Model):
-    technique_name = models.CharField(max_length=255, default='count')
-    skip = models.BooleanField(default=False)
+from django.db import models
+
+# Create your models here.
+from email.policy import default
+from xmlrpc.client import Boolean
+from django.db import models
+from django.contrib.postgres.fields import ArrayField, JSONField
+from django.db.models import JSONField
+
+class UIElementsDetection(models.Model):
+    add_words_columns = models.BooleanField(default=False)
+    type = models.CharField(max_length=25, default='rpa-us')
+    skip = models.BooleanField(null=True, default=None) # None: executed if its inputs changed, False: always executed, True: keeps its existing outputs
+    ocr_batch_size = models.IntegerField(default=8)
+    ocr_bucket_by_size = models.BooleanField(default=True)
+    detection_workers = models.IntegerField(default=1) # processes detecting the screenshots of a family, see the README for the celery pools
+    max_in_flight = models.IntegerField(default=0)
+    lazy_crops = models.BooleanField(default=False)
+
+class NoiseFiltering(models.Model):
+    type = models.CharField(max_length=25, default='attention-points')
+    configurations = JSONField()
+    # eyetracking_log_filename =  models.CharField(max_length=255, default="eyetracking_log.csv")
+
+class UIElementsClassification(models.Model):
+    model = models.CharField(max_length=255, default="resources/models/custom-v2.h5")
+    model_properties = models.CharField(max_length=255, default="resources/models/custom-v2-classes.json")
+    type = models.CharField(max_length=25, default='rpa-us')
+    skip = models.BooleanField(null=True, default=None) # None: executed if its inputs changed, False: always executed, True: keeps its existing outputs
+    keep_materialized_crops = models.BooleanField(default=False)
+    batch_size = models.IntegerField(default=64)
+
+class FeatureExtractionTechnique(models.Model):
+    technique_name = models.CharField(max_length=255, default='count')
+    skip = models.BooleanField(null=True, default=None) # None: executed if its inputs changed, False: always executed, True: keeps its existing outputs
+    configurations = JSONField(default=dict)
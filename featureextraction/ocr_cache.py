@@ -0,0 +1,46 @@
+import os
+import json
+import tempfile
+import numpy as np
+
+"""
+Content-addressed store of OCR results
+
+The words detected in a screenshot (and the corners of their boxes) only depend on the screenshot content, so they are
+stored by the SHA-256 of the screenshot bytes. The store is shared by all families, scenarios and case studies: a
+screenshot that appears in several logs (for instance, in the balanced and imbalanced variants of a family) is only
+recognized once.
+"""
+
+
+class OCRStore:
+
+    def __init__(self, root):
+        self.root = root
+        if not os.path.exists(root):
+            os.makedirs(root, exist_ok=True)
+
+    def entry_path(self, digest):
+        return os.path.join(self.root, digest[:2], digest + ".json")
+
+    def get(self, digest):
+        """
+        :returns: List of (word, box corners) tuples of the image, as returned by keras-ocr, or None if it has not been recognized yet
+        :rtype: list
+        """
+        path = self.entry_path(digest)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            entry = json.load(f)
+        return [(word, np.array(corners, dtype=np.float32)) for word, corners in entry]
+
+    def put(self, digest, predictions):
+        path = self.entry_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = [[word, np.asarray(corners).tolist()] for word, corners in predictions]
+        # Several workers may recognize the same screenshot at the same time: write to a temporary file and rename it
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
@@ -1,22 +1,22 @@
-from rest_framework import serializers
-from .models import UIElementsClassification, FeatureExtractionTechnique, UIElementsDetection, NoiseFiltering
-
-class UIElementsDetectionSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = UIElementsDetection
-        fields = '__all__' # ['eyetracking_log_filename', 'add_words_columns', 'skip', 'type']
-
-class NoiseFilteringSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = NoiseFiltering
-        fields = '__all__'
-
-class UIElementsClassificationSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = UIElementsClassification
-        fields = '__all__'
-
-class FeatureExtractionTechniqueSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = FeatureExtractionTechnique
+from rest_framework import serializers
+from .models import UIElementsClassification, FeatureExtractionTechnique, UIElementsDetection, NoiseFiltering
+
+class UIElementsDetectionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UIElementsDetection
+        fields = '__all__' # ['eyetracking_log_filename', 'add_words_columns', 'skip', 'type']
+
+class NoiseFilteringSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NoiseFiltering
+        fields = '__all__'
+
+class UIElementsClassificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UIElementsClassification
+        fields = '__all__'
+
+class FeatureExtractionTechniqueSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FeatureExtractionTechnique
         fields = '__all__'
\ No newline at end of file
@@ -0,0 +1,134 @@
+import numpy as np
+
+"""
+Spatial indexes over points of a screenshot
+
+The points are bucketed in a uniform grid of square cells, so the points lying inside a box are found by only checking
+the points of the cells the box covers, instead of all the points of the screenshot.
+"""
+
+
+class GridIndex:
+
+    def __init__(self, points, cell_size=64):
+        """
+        :param points: Array of shape (N, 2) with the (x, y) coordinates of the points
+        :type points: numpy.ndarray
+        :param cell_size: Side of the grid cells, in pixels
+        :type cell_size: int
+        """
+        self.points = np.asarray(points).reshape(-1, 2)
+        self.cell_size = cell_size
+        self.cells = {}
+        cells = np.floor(self.points / cell_size).astype(int)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        if len(order) > 0:
+            sorted_cells = cells[order]
+            starts = np.flatnonzero(np.any(np.diff(sorted_cells, axis=0) != 0, axis=1)) + 1
+            for group in np.split(order, starts):
+                self.cells[tuple(cells[group[0]])] = group
+
+    def query(self, col_min, row_min, col_max, row_max):
+        """
+        :returns: Indexes (ascending) of the points inside the box, borders included
+        :rtype: numpy.ndarray
+        """
+        candidates = [self.cells[(i, j)]
+                      for i in range(int(np.floor(col_min / self.cell_size)), int(np.floor(col_max / self.cell_size)) + 1)
+                      for j in range(int(np.floor(row_min / self.cell_size)), int(np.floor(row_max / self.cell_size)) + 1)
+                      if (i, j) in self.cells]
+        if not candidates:
+            return np.array([], dtype=int)
+        candidates = np.concatenate(candidates)
+        x = self.points[candidates, 0]
+        y = self.points[candidates, 1]
+        return np.sort(candidates[(col_min <= x) & (x <= col_max) & (row_min <= y) & (y <= row_max)])
+
+
+class WordsIndex:
+    """
+    Index over the centroids of the words detected by OCR in a screenshot, to find which words lie inside a UI element
+    """
+
+    def __init__(self, words, cell_size=64):
+        """
+        :param words: Dict which keys are the words and which values are the list of centroids (x, y) where they appear
+        :type words: dict
+        """
+        self.words = list(words.keys())
+        centroids = [centroid for word in self.words for centroid in words[word]]
+        self.owners = np.array([n for n, word in enumerate(self.words) for _ in words[word]], dtype=int)
+        self.grid = GridIndex(np.array(centroids, dtype=np.float64).reshape(-1, 2), cell_size)
+
+    def words_inside(self, col_min, row_min, col_max, row_max):
+        """
+        :returns: Words with at least one centroid inside the box, in the same order as in the words dict
+        :rtype: list
+        """
+        return [self.words[n] for n in np.unique(self.owners[self.grid.query(col_min, row_min, col_max, row_max)])]
+
+
+class BoxGridIndex:
+    """
+    Index over boxes that may grow, to find the boxes that can overlap a given one. Each box is registered in every
+    cell it covers, and a grown box is registered again in the new cells it covers.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.ranges = {}
+
+    def cells_range(self, box):
+        col_min, row_min, col_max, row_max = box
+        return (int(col_min // self.cell_size), int(row_min // self.cell_size),
+                int(col_max // self.cell_size), int(row_max // self.cell_size))
+
+    def insert(self, key, box):
+        """
+        Adds the box with the given key, or updates it if it was already inserted and has grown
+        """
+        i_min, j_min, i_max, j_max = self.cells_range(box)
+        old = self.ranges.get(key)
+        for i in range(i_min, i_max + 1):
+            for j in range(j_min, j_max + 1):
+                if old is not None and old[0] <= i <= old[2] and old[1] <= j <= old[3]:
+                    continue
+                self.cells.setdefault((i, j), []).append(key)
+        self.ranges[key] = (i_min, j_min, i_max, j_max)
+
+    def query(self, box):
+        """
+        :returns: Keys (ascending) of the boxes sharing at least one cell with the box
+        :rtype: list
+        """
+        i_min, j_min, i_max, j_max = self.cells_range(box)
+        keys = set()
+        for i in range(i_min, i_max + 1):
+            for j in range(j_min, j_max + 1):
+                keys.update(self.cells.get((i, j), ()))
+        return sorted(keys)
+
+
+def overlapping_pairs(boxes):
+    """
+    Sort and sweep over the column axis to find the pairs of boxes whose interiors overlap
+
+    :param boxes: Array of shape (N, 4) with the (col_min, row_min, col_max, row_max) of the boxes
+    :type boxes: numpy.ndarray
+    :returns: Two arrays with the indexes i < j of the overlapping pairs
+    :rtype: tuple
+    """
+    boxes = np.asarray(boxes).reshape(-1, 4)
+    order = np.argsort(boxes[:, 0], kind='stable')
+    col_min = boxes[order, 0]
+    # boxes after each one in the sweep that start before it ends
+    ends = np.searchsorted(col_min, boxes[order, 2], side='left')
+    counts = np.maximum(ends - np.arange(len(order)) - 1, 0)
+    first = np.repeat(np.arange(len(order)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    a, b = order[first], order[first + 1 + offsets]
+    overlap = (np.minimum(boxes[a, 2], boxes[b, 2]) > np.maximum(boxes[a, 0], boxes[b, 0])) & \
+              (np.minimum(boxes[a, 3], boxes[b, 3]) > np.maximum(boxes[a, 1], boxes[b, 1]))
+    a, b = a[overlap], b[overlap]
+    return np.minimum(a, b), np.maximum(a, b)
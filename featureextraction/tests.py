@@ -1,3 +1,365 @@
-from django.test import TestCase
-
-# Create your tests here.
+import os
+import json
+import multiprocessing
+import tempfile
+import threading
+import cv2
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+
+from featureextraction import utils
+from featureextraction.Component import Component
+from featureextraction.classification import classify_screenshots_stream, preprocess_legacy_crops
+from featureextraction.component_store import ComponentStore
+from featureextraction.crop_store import CropStore
+from featureextraction.detection import detect_images_components
+from featureextraction.feature_extraction_techniques import quantity_ui_elements_fe_technique, location_ui_elements_fe_technique, read_sparse_features
+
+# Create your tests here.
+
+
+def reference_rm_line(binary, max_line_thickness=utils.UIEDC.THRESHOLD_LINE_THICKNESS):
+    """
+    Pixel by pixel implementation of 'utils.rm_line', used as reference for the vectorized one
+    """
+    def is_valid_line(line):
+        line_length = 0
+        line_gap = 0
+        for j in line:
+            if j > 0:
+                if line_gap > 5:
+                    return False
+                line_length += 1
+                line_gap = 0
+            elif line_length > 0:
+                line_gap += 1
+        return line_length / width > 0.95
+
+    height, width = binary.shape[:2]
+    start_row, end_row = -1, -1
+    check_line = False
+    check_gap = False
+    for i, row in enumerate(binary):
+        if is_valid_line(row):
+            if not check_line:
+                start_row = i
+                check_line = True
+        else:
+            if check_line:
+                if i - start_row < max_line_thickness:
+                    end_row = i
+                    check_gap = True
+                else:
+                    start_row, end_row = -1, -1
+                check_line = False
+        if check_gap and i - end_row > max_line_thickness:
+            binary[start_row: end_row] = 0
+            start_row, end_row = -1, -1
+            check_line = False
+            check_gap = False
+    if (check_line and (height - start_row) < max_line_thickness) or check_gap:
+        binary[start_row: end_row] = 0
+
+
+def reference_is_block(clip, thread=0.15):
+    """
+    Line by line implementation of 'utils.is_block', used as reference for the vectorized one. The pixels are summed
+    one by one in their dtype, so the sums wrap around as in the original implementation
+    """
+    for side, steps in ((4, range(1, 5)), (-4, range(-1, -5, -1))):
+        if sum(sum(clip[side + i]) / 255 > thread * clip.shape[1] for i in steps) > 2:
+            return False
+        if sum(sum(clip[:, side + i]) / 255 > thread * clip.shape[0] for i in steps) > 2:
+            return False
+    return True
+
+
+def reference_component_regions(binary, min_obj_area, step_h=5, step_v=2):
+    """
+    Flood fill loop of the original 'utils.component_detection', used as reference for the labeled regions. The
+    seeds are checked against the mask with its 1 pixel offset, as the original loop did
+    """
+    mask = np.zeros((binary.shape[0] + 2, binary.shape[1] + 2), dtype=np.uint8)
+    regions = []
+    for i in range(0, binary.shape[0], step_h):
+        for j in range(i % 2, binary.shape[1], step_v):
+            if binary[i, j] == 255 and mask[i, j] == 0:
+                mask_copy = mask.copy()
+                ff = cv2.floodFill(binary, mask, (j, i), None, 0, 0, cv2.FLOODFILL_MASK_ONLY)
+                if ff[0] < min_obj_area: continue
+                region = np.reshape(cv2.findNonZero((mask - mask_copy)[1:-1, 1:-1]), (-1, 2))
+                regions.append(region[:, ::-1])
+    return regions
+
+
+def reference_legacy_crops(crops, image_shape, size=(50, 50)):
+    """
+    Crop by crop implementation of 'classification.preprocess_legacy_crops', with the original 'pad' and
+    tf.image.resize, used as reference for the vectorized one
+    """
+    def pad(img, h, w):
+        top_pad = np.floor((h - img.shape[0]) / 2).astype(np.uint16)
+        bottom_pad = np.ceil((h - img.shape[0]) / 2).astype(np.uint16)
+        right_pad = np.ceil((w - img.shape[1]) / 2).astype(np.uint16)
+        left_pad = np.floor((w - img.shape[1]) / 2).astype(np.uint16)
+        return np.copy(np.pad(img, ((top_pad, bottom_pad), (left_pad, right_pad), (0, 0)), mode='constant', constant_values=0))
+
+    x, y = image_shape[0], image_shape[1]
+    preprocessed_crops = []
+    for img in crops:
+        if img.shape[1] > y:
+            img = img[0:img.shape[0], 0:y]
+        if img.shape[0] > x:
+            img = img[0:x, 0:img.shape[1]]
+        crop_padded = pad(img, x, y)
+        crop_resized = tf.image.resize(crop_padded, list(size), method=tf.image.ResizeMethod.NEAREST_NEIGHBOR, preserve_aspect_ratio=True, antialias=True)
+        preprocessed_crops.append(crop_resized)
+    return np.array(preprocessed_crops)
+
+
+def sample_screenshot(rng, height=600, width=900):
+    """
+    Synthetic screenshot with boxes, text, full width separators (some of them dashed) and noise
+    """
+    img = np.full((height, width, 3), 240, np.uint8)
+    for _ in range(60):
+        x0, y0 = int(rng.integers(0, width - 10)), int(rng.integers(0, height - 10))
+        x1, y1 = int(min(width - 1, x0 + rng.integers(10, 400))), int(min(height - 1, y0 + rng.integers(10, 200)))
+        color = tuple(int(c) for c in rng.integers(0, 200, 3))
+        cv2.rectangle(img, (x0, y0), (x1, y1), color, int(rng.choice([-1, 1, 2])))
+        cv2.putText(img, 'Button', (x0 + 2, y0 + 12), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 0), 1)
+    for _ in range(8):
+        y = int(rng.integers(0, height - 4))
+        thickness = int(rng.integers(1, 5))
+        cv2.line(img, (0, y), (width - 1, y), (0, 0, 0), thickness)
+        # dashed separators, with gaps around the 5 pixels limit of a valid line
+        gap = int(rng.integers(3, 9))
+        for x in range(0, width, 40):
+            img[y:y + thickness, x:x + gap] = 240
+    noise = rng.random((height, width)) < 0.01
+    img[noise] = 0
+    return img
+
+
+class UIEDPreprocessingTests(SimpleTestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.binaries = [utils.binarization(sample_screenshot(self.rng), grad_min=3) for _ in range(5)]
+
+    def test_rm_line_matches_reference(self):
+        for binary in self.binaries:
+            expected = binary.copy()
+            reference_rm_line(expected)
+            result = binary.copy()
+            utils.rm_line(result)
+            np.testing.assert_array_equal(result, expected)
+
+    def test_component_detection_matches_reference(self):
+        # regions which only have seeds in the first row after the first fill, or which seeds are checked against
+        # the mask at a filled pixel of another region, are not filled
+        quirks = np.zeros((20, 70), np.uint8)
+        quirks[0:5, 2:11] = 255
+        quirks[5, 11:13] = 255
+        quirks[6:10, 11:31] = 255
+        quirks[0:4, 40:61] = 255
+        for binary in self.binaries + [quirks]:
+            utils.rm_line(binary)
+            expected = [Component(region, binary.shape) for region in reference_component_regions(binary, 25)]
+            expected = [compo for compo in expected if compo.width > 3 and compo.height > 3]
+            compos = utils.component_detection(binary, 25)
+            self.assertEqual(len(compos), len(expected))
+            for compo, expected_compo in zip(compos, expected):
+                np.testing.assert_array_equal(compo.region, expected_compo.region)
+
+    def test_is_block_matches_reference(self):
+        for binary in self.binaries:
+            utils.rm_line(binary)
+            compos = utils.component_detection(binary, 25)
+            clips = [compo.compo_clipping(binary) for compo in compos if compo.height > 10 and compo.width > 10]
+            for _ in range(20):
+                row, column = int(self.rng.integers(0, 500)), int(self.rng.integers(0, 800))
+                clips.append(binary[row:row + int(self.rng.integers(10, 100)), column:column + int(self.rng.integers(10, 100))])
+            # filled inner lines which uint8 sums wrap around below the threshold
+            wrapped = np.zeros((40, 40), np.uint8)
+            wrapped[5:9] = 255
+            clips.append(wrapped)
+            self.assertTrue(clips)
+            for clip in clips:
+                self.assertEqual(utils.is_block(clip), reference_is_block(clip))
+
+
+class LegacyPreprocessingTests(SimpleTestCase):
+
+    def test_preprocess_legacy_crops_matches_reference(self):
+        rng = np.random.default_rng(0)
+        # square, non-square, odd and upscaled image shapes
+        for image_shape in ([150, 150], [120, 64], [97, 151], [31, 45]):
+            crops = []
+            for height, width in ((1, 1), (5, 200), (image_shape[0], image_shape[1]), (200, 7), (33, 40), (300, 300)):
+                crops.append(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+            expected = reference_legacy_crops(crops, image_shape)
+            result = preprocess_legacy_crops(crops, image_shape)
+            self.assertEqual(result.dtype, expected.dtype)
+            np.testing.assert_array_equal(result, expected)
+
+
+class RecordingClassifier:
+    """
+    Classifier which records the crops it receives and classifies them by their size
+    """
+
+    def __init__(self):
+        self.crops = []
+
+    def predict(self, imgs, batch_size=64):
+        self.crops.extend(imgs)
+        return [str(img.shape[:2]) for img in imgs]
+
+
+class FailingClassifier:
+
+    def predict(self, imgs, batch_size=64):
+        raise RuntimeError("prediction failed")
+
+
+class ClassificationStreamTests(SimpleTestCase):
+
+    def test_failed_classification_stops_the_producer(self):
+        with tempfile.TemporaryDirectory() as folder:
+            root = folder + os.sep
+            crop_store = CropStore(root + "components_npy/")
+            component_store = ComponentStore(root + "components_json/")
+            names = [str(i) + ".png" for i in range(20)]
+            for name in names:
+                crop_store.put(name, [np.zeros((5, 5, 3), np.uint8)] * 4)
+                component_store.put(name, {"img_shape": [5, 5, 3], "compos": [{"id": i + 1, "class": "Compo", "column_min": 0, "row_min": 0, "column_max": 5,
+                                                                              "row_max": 5, "width": 5, "height": 5} for i in range(4)]})
+            with self.assertRaises(RuntimeError):
+                classify_screenshots_stream(FailingClassifier(), crop_store, component_store, names, batch_size=4, prefetch=2)
+            # the names of the threads include the name of their target
+            self.assertFalse([thread.name for thread in threading.enumerate()
+                              if "produce_screenshots_crops" in thread.name or "write_classified_screenshots" in thread.name])
+            component_store.close()
+
+
+class LegacyFolderRedetectionTests(SimpleTestCase):
+
+    def test_lazy_redetection_does_not_use_legacy_crops(self):
+        with tempfile.TemporaryDirectory() as folder:
+            root = folder + os.sep
+            for subfolder in ["components_npy", "components_json", "contours"]:
+                os.mkdir(root + subfolder)
+            cv2.imwrite(root + "1.png", sample_screenshot(np.random.default_rng(0)))
+
+            # outputs of a previous version: one pickled array of crops and one json per screenshot
+            stale_crops = np.empty(3, dtype=object)
+            for i in range(3):
+                stale_crops[i] = np.zeros((5, 5, 3), np.uint8)
+            np.save(root + "components_npy/1.png.npy", stale_crops, allow_pickle=True)
+            np.save(root + "components_npy/preprocessed_1.png.npy", stale_crops, allow_pickle=True)
+            with open(root + "components_json/1.png.json", "w") as f:
+                json.dump({"img_shape": [5, 15, 3], "compos": [{"id": i + 1, "class": "Compo", "column_min": 5 * i, "row_min": 0, "column_max": 5 * i + 5,
+                                                                "row_max": 5, "width": 5, "height": 5} for i in range(3)]}, f)
+
+            detect_images_components(root, None, None, False, ["1.png"], [[]], root + "contours/", False, "uied", lazy_crops=True)
+            self.assertFalse(os.path.exists(root + "components_npy/1.png.npy"))
+            self.assertFalse(os.path.exists(root + "components_npy/preprocessed_1.png.npy"))
+
+            component_store = ComponentStore(root + "components_json/")
+            compos = component_store.get("1.png")["compos"]
+            self.assertNotEqual(len(compos), 3)
+            classifier = RecordingClassifier()
+            classify_screenshots_stream(classifier, CropStore(root + "components_npy/"), component_store, ["1.png"], batch_size=4)
+
+            # one crop per new component, cut from its box, and classified in its position
+            self.assertEqual([crop.shape[:2] for crop in classifier.crops],
+                             [(compo["row_max"] - compo["row_min"], compo["column_max"] - compo["column_min"]) for compo in compos])
+            self.assertEqual([compo["class"] for compo in component_store.get("1.png")["compos"]],
+                             [str(crop.shape[:2]) for crop in classifier.crops])
+            component_store.close()
+
+
+def detect_in_daemonic_process(root, image_names):
+    """
+    Detects the components of the screenshots with several workers from a process of a daemonic pool, as the Celery
+    prefork workers
+    """
+    detected = detect_images_components(root, None, None, False, image_names, [[]] * len(image_names), root + "contours/", False, "uied",
+                                        detection_workers=2)
+    return os.getpid(), detected
+
+
+class ComponentStoreTests(SimpleTestCase):
+
+    def test_queries_only_read_the_given_screenshots(self):
+        with tempfile.TemporaryDirectory() as folder:
+            component_store = ComponentStore(folder + os.sep)
+            for i, name in enumerate(["1.png", "2.png", "3.png"]):
+                component_store.put(name, {"img_shape": [10 * (i + 1), 20], "compos": [
+                    {"id": 1, "class": "x0_Button", "column_min": 0, "row_min": 0, "column_max": 5, "row_max": 5, "width": 5, "height": 5}]})
+
+            self.assertEqual(sorted(component_store.class_counts(["3.png", "1.png"])["screenshot"]), ["1.png", "3.png"])
+            self.assertEqual(list(component_store.components_frame(["2.png"], ["screenshot", "class"])["screenshot"]), ["2.png"])
+            self.assertEqual(component_store.images_sizes(["3.png", "1.png"]).tolist(), [[30, 20], [10, 20]])
+            component_store.close()
+
+
+class DetectionWorkersTests(SimpleTestCase):
+
+    def test_daemonic_process_detects_with_workers(self):
+        with tempfile.TemporaryDirectory() as folder:
+            root = folder + os.sep
+            for subfolder in ["components_npy", "components_json", "contours"]:
+                os.mkdir(root + subfolder)
+            image_names = [str(i) + ".png" for i in range(3)]
+            for i, image_name in enumerate(image_names):
+                cv2.imwrite(root + image_name, sample_screenshot(np.random.default_rng(i)))
+
+            serial = detect_images_components(root, None, None, False, image_names, [[]] * 3, root + "contours/", False, "uied")
+            with multiprocessing.Pool(1) as pool:
+                pid, detected = pool.apply(detect_in_daemonic_process, (root, image_names))
+            self.assertEqual(detected, serial)
+            # the crops were stored by the workers, each one in the shard of its process
+            shards = [filename for filename in os.listdir(root + "components_npy") if filename.endswith(".idx")]
+            self.assertTrue(shards)
+            self.assertNotIn("crops-" + str(pid) + ".idx", shards)
+
+
+class FeatureExtractionTechniquesTests(SimpleTestCase):
+
+    def test_rows_without_screenshot_are_rejected(self):
+        with tempfile.TemporaryDirectory() as folder:
+            root = folder + os.sep
+            with open(root + "log.csv", "w") as f:
+                f.write("Screenshot,Activity\n1.png,A\n,B\n2.png,C\n")
+            # the row without screenshot must not take the features of another screenshot
+            with self.assertRaises(ValidationError):
+                quantity_ui_elements_fe_technique(["x0_Button"], "Screenshot", root + "components_json/", root + "log.csv", root + "enriched.csv")
+            self.assertFalse(os.path.exists(root + "enriched.csv"))
+            with self.assertRaises(ValidationError):
+                location_ui_elements_fe_technique(["x0_Button"], "Screenshot", root + "components_json/", root + "log.csv", root + "enriched.csv")
+            self.assertFalse(os.path.exists(root + "enriched.csv"))
+
+    def test_sparse_features_match_the_enriched_log(self):
+        with tempfile.TemporaryDirectory() as folder:
+            root = folder + os.sep
+            component_store = ComponentStore(root + "components_json/")
+            for i, name in enumerate(["1.png", "2.png"]):
+                component_store.put(name, {"img_shape": [100, 100], "compos": [
+                    {"id": j + 1, "class": "x0_Button", "column_min": 60 * j, "row_min": 10 * i, "column_max": 60 * j + 10, "row_max": 10 * i + 10,
+                     "width": 10, "height": 10} for j in range(i + 1)]})
+            component_store.close()
+            with open(root + "log.csv", "w") as f:
+                f.write("Screenshot,Activity\n1.png,A\n2.png,B\n1.png,C\n")
+
+            location_ui_elements_fe_technique(["x0_Button"], "Screenshot", root + "components_json/", root + "log.csv", root + "enriched.csv",
+                                              {"grid": [2, 2]})
+            features, columns = read_sparse_features(root + "enriched.csv")
+            enriched = pd.read_csv(root + "enriched.csv", index_col=0)
+            self.assertEqual(columns, ["x0_Button_0_0", "x0_Button_0_1", "x0_Button_1_0", "x0_Button_1_1"])
+            np.testing.assert_array_equal(features.toarray(), enriched[columns].values)
+            np.testing.assert_array_equal(features.toarray(), [[1, 0, 0, 0], [1, 1, 0, 0], [1, 0, 0, 0]])
@@ -1,7 +1,7 @@
-import os
-from celery import Celery
-
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rim.settings")
-app = Celery("rim")
-app.config_from_object("django.conf:settings", namespace="CELERY")
+import os
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "rim.settings")
+app = Celery("rim")
+app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
\ No newline at end of file
@@ -0,0 +1,15 @@
+import hashlib
+
+
+def file_sha256(path):
+    """
+    :param path: Path to the file
+    :type path: str
+    :returns: SHA-256 of the file bytes, read in chunks of 1 MiB
+    :rtype: str
+    """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()